@@ -0,0 +1,65 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# Fixed-point scales, as powers of ten
+MONEY_DIGITS = 3  # Cash and unit prices are integer mills
+RATE_DIGITS = 6  # Per-unit prices are integer micro-dollars
+STOCK_DIGITS = 3  # Stock and recipe amounts are integer milli-units
+
+MONEY_SCALE = 10 ** MONEY_DIGITS
+RATE_SCALE = 10 ** RATE_DIGITS
+STOCK_SCALE = 10 ** STOCK_DIGITS
+
+# A per-unit rate times a stock amount is in units of 10 ** -(RATE_DIGITS + STOCK_DIGITS) dollars
+RATE_STOCK_TO_MONEY = 10 ** (RATE_DIGITS + STOCK_DIGITS - MONEY_DIGITS)
+
+
+def to_fixed(value, digits):
+    """
+    Convert a number or numeric string to a fixed-point integer, rounding half to even.
+
+    Floats go through their shortest repr, so 0.33 becomes 330 milli-units rather
+    than inheriting the binary artifacts of Decimal(0.33).
+
+    Parameters:
+        - value (int, float, str, Decimal): The value to convert.
+        - digits (int): Number of decimal digits kept.
+
+    Returns:
+        int: The value scaled by 10 ** digits.
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    value = Decimal(value).scaleb(digits)
+    return int(value.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_fixed(amount, digits):
+    """
+    Convert a fixed-point integer back to a Decimal for display and save files.
+
+    Parameters:
+        - amount (int): The scaled integer.
+        - digits (int): Number of decimal digits it carries.
+
+    Returns:
+        Decimal: The exact value, with `digits` decimal places.
+    """
+    return Decimal(amount).scaleb(-digits)
+
+
+def round_div(numerator, denominator):
+    """
+    Divide two integers, rounding half to even.
+
+    Parameters:
+        - numerator (int): The dividend.
+        - denominator (int): The divisor; must be positive.
+
+    Returns:
+        int: The rounded quotient.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
@@ -0,0 +1,254 @@
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+from tracing import get_channel
+
+trace = get_channel('data')
+
+AUTOSAVE_FILE = 'autosave.json.gz'
+
+
+def capture_game(shop, customer_manager=None, employee_manager=None, engine=None):
+    """
+    Copy the state worth saving, cheaply enough to run on the main thread.
+
+    Integer columns are copied with a single memcpy each and no value is
+    converted or formatted here; that is left to the autosave worker.
+
+    Returns:
+        dict: The captured state.
+    """
+    state = {
+        'saved_at': time.time(),
+        'shop': {
+            'cash_mills': shop.cash_mills,
+            'cleanliness': shop.cleanliness,
+            'customer_service': shop.customer_service,
+            'inventory': shop.inventory.copy_columns(),
+        },
+    }
+    if engine is not None:
+        state['clock'] = {'day': engine.day, 'minute': engine.minute, 'store_open': engine.store_open,
+                          'popularity': engine.popularity}
+    if customer_manager is not None:
+        population = customer_manager.population
+        state['customers'] = {
+            'regulars': sorted(customer.name for customer in customer_manager.regular_customers),
+            'reviews': list(customer_manager.reviews),
+            'review_aggregates': customer_manager.reviews.aggregates(),
+            'population': None if population is None else {
+                'active': population.active.copy(),
+                'regular': population.regular.copy(),
+                'visits': population.visits.copy(),
+            },
+        }
+    if employee_manager is not None:
+        state['employees'] = [
+            {'name': employee.name, 'employee_id': employee.employee_id, 'role': employee.role,
+             'rating': employee.rating, 'trained': employee.trained}
+            for employee in employee_manager.employees
+        ]
+    return state
+
+
+def _to_json(value):
+    # array.array and NumPy arrays both convert with tolist()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def read_autosave(path=AUTOSAVE_FILE):
+    """
+    Read a state written by AutosaveService, or return None if there is none.
+    """
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def restore_game(state, shop, customer_manager=None, employee_manager=None, engine=None):
+    """
+    Apply a state read by read_autosave() to a freshly built game.
+
+    The array-backed customer population is not restored from here: a
+    CustomerRegistry keeps its own records (customers.npz), and a generated
+    population does not outlive its run.
+
+    Parameters:
+        - state (dict): The saved state.
+        - shop (Shop): The shop to restore; None to leave the shop to a newer save.
+        - customer_manager (CustomerManager): Gets back its regulars and reviews (optional).
+        - employee_manager (EmployeeManager): Gets back its employees (optional).
+        - engine (SimulationEngine): Gets back its day, minute, open flag and popularity (optional).
+    """
+    from employees.employee import Employee
+    from game_logic import CASH_CHANGED
+    from inventory import InventoryTable
+
+    if shop is not None:
+        saved_shop = state['shop']
+        shop.cleanliness = saved_shop['cleanliness']
+        shop.customer_service = saved_shop['customer_service']
+        shop.cash_mills = saved_shop['cash_mills']
+        shop.reset_inventory(InventoryTable.from_columns(saved_shop['inventory']))
+        shop.publish(CASH_CHANGED, shop.cash_mills)
+
+    clock = state.get('clock')
+    if engine is not None and clock is not None:
+        engine.restore(clock['day'], clock['minute'], clock['store_open'], clock['popularity'])
+
+    customers = state.get('customers')
+    if customer_manager is not None and customers is not None:
+        customer_manager.reviews.restore(customers['reviews'], customers['review_aggregates'])
+        regulars = set(customers['regulars'])
+        customer_manager.regular_customers = {customer for customer in customer_manager.customers
+                                              if customer.name in regulars}
+
+    if employee_manager is not None and 'employees' in state:
+        employees = []
+        for saved in state['employees']:
+            employee = Employee(saved['name'], saved['employee_id'], saved['role'], rating=saved['rating'])
+            employee.trained = saved['trained']
+            employees.append(employee)
+        employee_manager.employees = employees
+
+
+class AutosaveService:
+    """
+    Writes compressed full-state saves on a background thread.
+
+    request() captures the state on the calling thread and queues it; the
+    worker serializes, compresses and atomically renames it into place. The
+    queue is bounded: when saves back up, new requests are dropped instead of
+    stalling the game, and the drop is counted in the metrics.
+
+    Attributes:
+        - capture (callable): Returns the state to save; called on the requesting thread.
+        - path (str): File the saves are written to.
+        - interval (float): Seconds between saves requested by poll().
+        - compresslevel (int): gzip compression level.
+    """
+    def __init__(self, capture, path=AUTOSAVE_FILE, interval=60.0, max_pending=2, compresslevel=6):
+        """
+        Initialize an AutosaveService; call start() to run the worker.
+
+        Parameters:
+            - capture (callable): Returns the state to save; called on the requesting thread.
+            - path (str): File the saves are written to.
+            - interval (float): Seconds between saves requested by poll().
+            - max_pending (int): Captured states allowed to wait for the worker.
+            - compresslevel (int): gzip compression level.
+        """
+        self.capture = capture
+        self.path = path
+        self.interval = interval
+        self.compresslevel = compresslevel
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._next_save = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'requested': 0, 'saved': 0, 'dropped': 0, 'failed': 0,
+            'last_duration': 0.0, 'max_duration': 0.0, 'total_duration': 0.0,
+            'last_bytes': 0, 'last_error': None,
+        }
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+            self._thread.start()
+        self._next_save = time.monotonic() + self.interval
+
+    def stop(self, timeout=None):
+        """
+        Finish the pending saves and stop the worker.
+        """
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self, now=None):
+        """
+        Request a save if the interval has passed since the last one.
+
+        Returns:
+            bool: True if a save was queued.
+        """
+        now = time.monotonic() if now is None else now
+        if self._next_save is None or now < self._next_save:
+            return False
+        self._next_save = now + self.interval
+        return self.request()
+
+    def request(self):
+        """
+        Capture the state now and queue it for the worker.
+
+        Returns:
+            bool: True if the save was queued, False if too many saves were already pending.
+        """
+        state = self.capture()
+        with self._lock:
+            self._metrics['requested'] += 1
+        try:
+            self._pending.put_nowait(state)
+        except queue.Full:
+            with self._lock:
+                self._metrics['dropped'] += 1
+            if trace.enabled:
+                trace.warning("Autosave dropped: %d saves already pending", self._pending.maxsize)
+            return False
+        return True
+
+    def metrics(self):
+        """
+        Return a copy of the save counters and durations (in seconds).
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['pending'] = self._pending.qsize()
+        metrics['mean_duration'] = metrics['total_duration'] / metrics['saved'] if metrics['saved'] else 0.0
+        return metrics
+
+    def _run(self):
+        while True:
+            state = self._pending.get()
+            if state is None:
+                return
+            started = time.perf_counter()
+            try:
+                size = self._write(state)
+            except (OSError, TypeError, ValueError) as e:
+                with self._lock:
+                    self._metrics['failed'] += 1
+                    self._metrics['last_error'] = repr(e)
+                if trace.enabled:
+                    trace.warning("Autosave to %s failed: %r", self.path, e)
+                continue
+            duration = time.perf_counter() - started
+            with self._lock:
+                metrics = self._metrics
+                metrics['saved'] += 1
+                metrics['last_duration'] = duration
+                metrics['max_duration'] = max(metrics['max_duration'], duration)
+                metrics['total_duration'] += duration
+                metrics['last_bytes'] = size
+
+    def _write(self, state):
+        payload = gzip.compress(json.dumps(state, default=_to_json, separators=(',', ':')).encode('utf-8'),
+                                compresslevel=self.compresslevel)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        return len(payload)
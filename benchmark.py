@@ -0,0 +1,291 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless: no window is ever shown
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pygame
+
+from constants import SUBS
+from customers import CustomerManager, CustomerRegistry, NameFile, generate_population
+from data_handler import parse_data
+from game_logic import Shop
+from gamestate import GameState
+from helpers import load_font
+
+RESULTS_FILE = 'benchmarks.json'
+SCREEN_SIZE = (1280, 800)
+
+BENCHMARKS = []
+CLEANUP = contextlib.ExitStack()  # Unwound after each benchmark: game states, then their save directories
+
+
+def benchmark(name, repeat=5, large=False):
+    """
+    Register a benchmark. The decorated function does the setup and returns (run, operations):
+    a callable to time and the number of operations one call performs.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup, repeat, large))
+        return setup
+    return register
+
+
+def synthetic_catalog(count):
+    """
+    Vendor export text for `count` products, starting with every product the recipes use.
+    """
+    recipe_products = sorted({product for ingredients in SUBS.values() for product in ingredients})
+    product_numbers = recipe_products + [str(9000000 + i) for i in range(max(0, count - len(recipe_products)))]
+    lines = []
+    for i, product_number in enumerate(product_numbers):
+        lines += [product_number, f"PRODUCT {product_number}", "CASE", "-",
+                  f"${10 + i % 40}.{i % 100:02d}", "-", f"{1 + i % 4}/{5 + i % 3}LB", "-"]
+    return "\n".join(lines)
+
+
+def stocked_shop(count=0, units=1000):
+    shop = Shop()
+    for item in parse_data(synthetic_catalog(count)):
+        shop.add_item(item)
+    shop.cash = 10 ** 9
+    for product_number in list(shop.inventory):
+        shop.buy_stock(product_number, units)
+    return shop
+
+
+@benchmark('parse_data 10k SKUs')
+def bench_parse_data():
+    text = synthetic_catalog(10000)
+    return (lambda: parse_data(text)), 10000
+
+
+@benchmark('Shop.sell_sub')
+def bench_sell_sub():
+    shop = stocked_shop(units=10 ** 6)
+    sub_ids = list(SUBS)
+    orders = [sub_ids[i % len(sub_ids)] for i in range(5000)]
+
+    def run():
+        for sub_id in orders:
+            shop.sell_sub(sub_id, 'REGULAR', 'WHITE', ['MAYO', 'MUSTARD'])
+    return run, len(orders)
+
+
+@benchmark('Shop.buy_stock')
+def bench_buy_stock():
+    shop = stocked_shop(1000, units=0)
+    product_numbers = list(shop.inventory)
+
+    def run():
+        for product_number in product_numbers:
+            shop.buy_stock(product_number, 1)
+    return run, len(product_numbers)
+
+
+def bench_simulate(size):
+    shop = stocked_shop(units=10 ** 7)
+    customer_manager = CustomerManager()
+    population = generate_population(size, np.random.default_rng(0))
+    customer_manager.population = population
+
+    def run():
+        population.active[:] = True  # Every customer visits on every call
+        customer_manager.simulate_customers(shop, 720)
+    return run, size
+
+
+@benchmark('CustomerManager.simulate_customers 22k')
+def bench_simulate_22k():
+    return bench_simulate(22000)
+
+
+@benchmark('CustomerManager.simulate_customers 1M', repeat=2, large=True)
+def bench_simulate_1m():
+    return bench_simulate(1000000)
+
+
+@benchmark('CustomerRegistry 600 minutes from new game')
+def bench_registry():
+    shop = stocked_shop(units=10 ** 7)
+    names = NameFile()
+
+    def run():
+        registry = CustomerRegistry(names, np.random.default_rng(0))  # What starting a new game costs
+        for _ in range(600):
+            registry.simulate_customers(shop, 30)
+    return run, 600
+
+
+@benchmark('Shop.show_inventory 10k SKUs')
+def bench_show_inventory():
+    shop = stocked_shop(10000, units=3)
+    return shop.show_inventory, len(shop.inventory)
+
+
+@benchmark('CustomerManager.show_reviews')
+def bench_show_reviews():
+    shop = stocked_shop(units=10 ** 6)
+    customer_manager = CustomerManager()
+    customer_manager.population = generate_population(5000, np.random.default_rng(0))
+    customer_manager.simulate_customers(shop, 720)
+    return customer_manager.show_reviews, len(customer_manager.reviews)
+
+
+def bench_game_state(save_dir):
+    """
+    A main.GameState over the synthetic catalog, stocked and saving into `save_dir`.
+    """
+    game_state = GameState(parse_data(synthetic_catalog(0)), save_dir=save_dir)
+    shop = game_state.shop
+    shop.cash = 10 ** 9
+    for product_number in list(shop.inventory):
+        shop.buy_stock(product_number, 100)
+    return game_state
+
+
+def ui_game_state():
+    from ui_elements import initialize_ui_elements
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    game_state = bench_game_state(CLEANUP.enter_context(tempfile.TemporaryDirectory()))
+    CLEANUP.callback(game_state.close)  # Stops the autosave thread and closes the journal
+    initialize_ui_elements(SCREEN_SIZE[0], SCREEN_SIZE[1], load_font('Montserrat-Regular.ttf', 36),
+                           game_state, lambda: None, lambda: None)
+    return screen, game_state
+
+
+@benchmark('ScrollableText.add_text growing log')
+def bench_add_text():
+    from ui_elements import ScrollableText
+    screen, game_state = ui_game_state()
+    font = load_font('Montserrat-Regular.ttf', 36)
+    log = ScrollableText(10, 60, 600, 600, font, load_font('Montserrat-Regular.ttf', 24), game_state)
+    lines = [f"Customer {i}: {i % 100} (Order Successful: {i % 3 == 0})" for i in range(1000)]
+
+    def run():
+        for line in lines:
+            log.add_text(line)  # The log keeps growing across repeats
+        log.draw(screen)
+    return run, len(lines)
+
+
+@benchmark('handle_events mouse motion flood')
+def bench_motion_flood():
+    from ui_elements import handle_events
+    screen, game_state = ui_game_state()
+    events = [pygame.event.Event(pygame.MOUSEMOTION, pos=(i % SCREEN_SIZE[0], i % SCREEN_SIZE[1]), rel=(1, 1), buttons=(0, 0, 0))
+              for i in range(10000)]
+    return (lambda: handle_events([], events, game_state)), len(events)
+
+
+@benchmark('game_loop frame')
+def bench_frame():
+    from ui_elements import DirtyRectRenderer, handle_events, ui_widgets, update_game_state
+    screen, game_state = ui_game_state()
+    renderer = DirtyRectRenderer(screen, pygame.Surface(SCREEN_SIZE))
+    renderer.render(ui_widgets(game_state))
+    frames = 60
+
+    def run():
+        for _ in range(frames):
+            if not game_state.day_started:  # As main.start_day does
+                game_state.engine.open_day()
+                game_state.day_started = True
+            handle_events([], pygame.event.get(), game_state)
+            update_game_state(game_state, 1.0)  # One simulated minute per frame
+            renderer.render(ui_widgets(game_state))
+    return run, frames
+
+
+def run_benchmarks(name_filter=None, include_large=True):
+    """
+    Run the registered benchmarks.
+
+    Returns:
+        dict: Benchmark name -> best, median and per-operation timings in seconds.
+    """
+    results = {}
+    for name, setup, repeat, large in BENCHMARKS:
+        if (name_filter and name_filter.lower() not in name.lower()) or (large and not include_large):
+            continue
+        with CLEANUP:
+            run, operations = setup()
+            run()  # Warm up caches before timing
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {
+            'best': best,
+            'median': statistics.median(timings),
+            'operations': operations,
+            'per_operation': best / operations,
+            'operations_per_second': operations / best if best else float('inf'),
+        }
+        print(f"{name:45s} {best * 1000:10.2f} ms  {results[name]['operations_per_second']:14,.0f} ops/s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare best timings against a baseline run.
+
+    Returns:
+        list: Names of the benchmarks more than `threshold` (a fraction) slower than the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:45s} (no baseline)")
+            continue
+        ratio = result['best'] / base['best'] if base['best'] else float('inf')
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{name:45s} {ratio:6.2f}x baseline  {status}")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the shop's hot paths headless.")
+    parser.add_argument('--output', default=RESULTS_FILE, help="JSON file to write the results to")
+    parser.add_argument('--compare', metavar='BASELINE', help="Results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed slowdown before failing, as a fraction")
+    parser.add_argument('--filter', help="Only run benchmarks whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="Skip the 1M-customer benchmark")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Fonts are loaded relative to the repo
+    pygame.init()
+    results = run_benchmarks(args.filter, not args.quick)
+    with open(output, 'w') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created': time.time(),
+            'results': results,
+        }, f, indent=2)
+
+    if baseline_path:
+        with open(baseline_path, 'r') as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
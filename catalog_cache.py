@@ -0,0 +1,144 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from data_handler import Item, iter_items, parse_data
+from tracing import get_channel
+
+trace = get_channel('data')
+
+CACHE_FILE = 'catalog.cache'
+MAGIC = b'SHOPCAT1'
+HEADER = struct.Struct('<8s32sI')  # magic, SHA-256 of the source, item count
+
+
+def source_hash(source):
+    """
+    Hash the raw vendor text a cache was compiled from.
+    """
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    return hashlib.sha256(source).digest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Hash a vendor export file without reading it into memory at once.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _little_endian(column):
+    if sys.byteorder != 'little':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def _pack_strings(strings):
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('I', [0])
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    return _little_endian(offsets).tobytes() + b''.join(encoded)
+
+
+def _unpack_strings(view, position, count):
+    offsets = array('I')
+    offsets.frombytes(view[position:position + 4 * (count + 1)])
+    offsets = _little_endian(offsets)
+    position += 4 * (count + 1)
+    blob = bytes(view[position:position + offsets[-1]])
+    strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+    return strings, position + offsets[-1]
+
+
+def _unpack_ints(view, position, count):
+    column = array('q')
+    column.frombytes(view[position:position + 8 * count])
+    return _little_endian(column), position + 8 * count
+
+
+def compile_catalog(items, digest, path=CACHE_FILE):
+    """
+    Write parsed items to a columnar cache file, atomically replacing any previous cache.
+    """
+    body = [
+        HEADER.pack(MAGIC, digest, len(items)),
+        _pack_strings(item.product_number for item in items),
+        _pack_strings(item.name for item in items),
+        _pack_strings(item.vendor_unit for item in items),
+        _little_endian(array('q', (item.unit_price_mills for item in items))).tobytes(),
+        _little_endian(array('q', (item.price_per_unit_micros for item in items))).tobytes(),
+    ]
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(b''.join(body))
+    os.replace(temp_path, path)
+
+
+def read_catalog(digest, path=CACHE_FILE):
+    """
+    Load items from a cache file compiled from the source with hash `digest`.
+
+    Returns:
+        list: The items, or None if the cache is missing, stale or unreadable.
+    """
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                magic, cached_digest, count = HEADER.unpack_from(view)
+                if magic != MAGIC or cached_digest != digest:
+                    return None
+                position = HEADER.size
+                product_numbers, position = _unpack_strings(view, position, count)
+                names, position = _unpack_strings(view, position, count)
+                vendor_units, position = _unpack_strings(view, position, count)
+                unit_prices, position = _unpack_ints(view, position, count)
+                prices_per_unit, position = _unpack_ints(view, position, count)
+            finally:
+                view.release()
+    except (OSError, ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+    return [Item.from_fixed(product_number, name, unit_price, vendor_unit, price_per_unit)
+            for product_number, name, unit_price, vendor_unit, price_per_unit
+            in zip(product_numbers, names, unit_prices, vendor_units, prices_per_unit)]
+
+
+def _load_cached(digest, path, parse):
+    items = read_catalog(digest, path)
+    if items is not None:
+        if trace.enabled:
+            trace.info("Loaded %d items from %s", len(items), path)
+        return items
+
+    items = parse()
+    try:
+        compile_catalog(items, digest, path)
+    except OSError as e:
+        if trace.enabled:
+            trace.warning("Cannot write catalog cache %s: %r", path, e)
+    return items
+
+
+def load_catalog(data, path=CACHE_FILE):
+    """
+    Return the catalog items for the raw vendor text `data`, reparsing only when it changed.
+    """
+    return _load_cached(source_hash(data), path, lambda: parse_data(data))
+
+
+def load_catalog_file(source_path, path=CACHE_FILE, diagnostics=None):
+    """
+    Return the catalog items of a vendor export file, streaming it through the parser only when it changed.
+    """
+    return _load_cached(file_hash(source_path), path, lambda: list(iter_items(source_path, diagnostics)))
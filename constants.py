@@ -1,5 +1,3 @@
-import pygame
-
 # Define constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
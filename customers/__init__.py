@@ -1,3 +1,6 @@
 # Initialize the customers module
 from .customers import Customer, generate_customers
-from .customer_manager import CustomerManager
+from .customer_manager import CustomerManager, REVIEW_ADDED, REVIEWS_RECORDED, format_review
+from .population import CustomerPopulation, VisitBatch, generate_population
+from .review_log import ReviewLog
+from .registry import CustomerRegistry, NameFile
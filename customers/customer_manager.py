@@ -1,22 +1,55 @@
 import random
+from observable import Observable  # Import the change-notification mixin
 from .customers import Customer
+from .population import SUB_IDS  # Sub ID labels for batched review histograms
+from .review_log import ReviewLog  # Import the bounded review store
 
-class CustomerManager:
+REVIEW_ADDED = 'review_added'  # Topic published with the new reviews kept in the review log
+REVIEWS_RECORDED = 'reviews_recorded'  # Topic published with every new review, including those the log had no room for
+
+
+def format_review(review):
+    """
+    Format a review for display.
+
+    Parameters:
+        - review (dict): The review.
+
+    Returns:
+        str: A one-line representation of the review.
+    """
+    return f"{review['customer']}: {review['review_score']} (Order Successful: {review['order_successful']})"
+
+
+class CustomerManager(Observable):
     """
     CustomerManager class to manage multiple customers.
 
+    Publishes REVIEW_ADDED with the new reviews kept in the review log after
+    every simulation step. A batch larger than the log's capacity keeps only
+    its newest reviews, so subscribers that need every review (the history)
+    listen to REVIEWS_RECORDED instead; its reviews are only built while
+    something subscribes to it.
+
     Attributes:
         - customers (list): List of current customers.
-        - regular_customers (list): List of regular customers.
-        - reviews (list): List of reviews.
+        - regular_customers (set): Set of regular customers.
+        - reviews (ReviewLog): Recent reviews and running review aggregates.
+        - population (CustomerPopulation): Array-backed customers, simulated in batches (optional).
     """
-    def __init__(self):
+    def __init__(self, review_capacity=1000, review_spill_path=None):
         """
         Initialize a CustomerManager object.
+
+        Parameters:
+            - review_capacity (int): Number of recent reviews kept for display.
+            - review_spill_path (str): File to append the full review history to (optional).
         """
+        super().__init__()  # Set up subscribers and version counters
         self.customers = []  # Initialize an empty list of customers
-        self.regular_customers = []  # Initialize an empty list of regular customers
-        self.reviews = []  # Initialize an empty list of reviews
+        self.regular_customers = set()  # Initialize an empty set of regular customers
+        self.reviews = ReviewLog(review_capacity, review_spill_path)  # Initialize an empty review log
+        self.population = None  # No array-backed population until one is assigned
 
     def add_customer(self, customer):
         """
@@ -27,34 +60,74 @@ class CustomerManager:
         """
         self.customers.append(customer)  # Append the customer to the customers list
 
-    def simulate_customers(self, shop):
+    def simulate_customers(self, shop, minute=None, arrivals=None):
         """
         Simulate customer interactions with the shop.
 
         Parameters:
             - shop (Shop): The shop instance.
+            - minute (int): Minutes after midnight of the simulated visit (optional).
+            - arrivals (int): Number of customers visiting; every customer visits if omitted.
+        """
+        if self.population is not None:  # Simulate the visiting customers in one batch
+            batch = self.population.simulate_customers(shop, arrivals)
+            if self.has_subscribers(REVIEWS_RECORDED):
+                all_reviews = list(batch.iter_reviews(self.population, 0, minute))
+                make_reviews = lambda start: all_reviews[start:]
+            else:
+                all_reviews = None
+                make_reviews = lambda start: list(batch.iter_reviews(self.population, start, minute))
+            new_reviews = self.reviews.extend_batch(
+                batch.review_scores, batch.order_successful, batch.sub_ids, SUB_IDS, make_reviews, minute
+            )  # Record the batch, keeping only what fits in the ring buffer
+        else:
+            new_reviews = all_reviews = self._simulate_customer_list(shop, minute, arrivals)
+        if all_reviews:
+            self.publish(REVIEWS_RECORDED, all_reviews)  # Notify subscribers of every review
+        if new_reviews:
+            self.publish(REVIEW_ADDED, new_reviews)  # Notify subscribers of the reviews kept in the log
+
+    def _simulate_customer_list(self, shop, minute, arrivals=None):
+        """
+        Simulate each Customer object in turn.
+
+        Parameters:
+            - shop (Shop): The shop instance.
+            - minute (int): Minutes after midnight of the simulated visit, or None.
+            - arrivals (int): Number of randomly picked customers visiting, or None for all of them.
+
+        Returns:
+            list: The reviews left by the customers.
         """
-        for customer in self.customers:  # Iterate through each customer
+        new_reviews = []
+        visitors = self.customers if arrivals is None else random.sample(self.customers, min(arrivals, len(self.customers)))
+        for customer in visitors:  # Iterate through each visiting customer
             order = customer.generate_order()  # Generate an order for the customer
             result = shop.sell_sub(order['sub_id'], order['size'], order['bread_type'], order['extras'])  # Attempt to sell the sub
             order_successful = "Sold" in result  # Check if the order was successful
             review_score = customer.review_experience(order_successful, shop.cleanliness, shop.customer_service)  # Get the review score
-            self.reviews.append({
+            review = {
                 'customer': customer.name,
                 'review_score': review_score,
-                'order_successful': order_successful
-            })  # Add the review to the reviews list
+                'order_successful': order_successful,
+                'sub_id': order['sub_id']
+            }
+            if minute is not None:
+                review['minute'] = minute
+            self.reviews.append(review, minute)  # Add the review to the review log
+            new_reviews.append(review)
 
             if customer.decide_to_return(review_score):  # Check if the customer decides to return
-                self.regular_customers.append(customer)  # Add to regular customers
+                self.regular_customers.add(customer)  # Add to regular customers
             else:
                 self.customers.remove(customer)  # Remove from customers
+        return new_reviews
 
     def show_reviews(self):
         """
-        Show all reviews.
+        Show the recent reviews.
 
         Returns:
-            str: A string representation of all reviews.
+            str: A string representation of the reviews kept in the review log.
         """
-        return "\n".join([f"{review['customer']}: {review['review_score']} (Order Successful: {review['order_successful']})" for review in self.reviews])  # Format and join reviews
+        return "\n".join([format_review(review) for review in self.reviews])  # Format and join reviews
@@ -0,0 +1,267 @@
+import numpy as np  # Import NumPy for the struct-of-arrays customer store
+from constants import SUBS, SIZES, BREAD_TYPES, TOPPINGS  # Import constants for subs, sizes, breads and toppings
+from .customers import load_customer_names  # Reuse the customer name loader
+
+SUB_IDS = list(SUBS.keys())  # Sub IDs, indexed by the sub codes drawn for orders
+SIZE_NAMES = list(SIZES.keys())  # Size names, indexed by the size codes drawn for orders
+BASE_EXTRAS = ['LETTUCE', 'ONIONS', 'TOMATO', 'OIL', 'VINEGAR', 'OREGANO', 'SALT']  # Extras every order gets
+ADDITIONAL_EXTRAS = [extra for extra in TOPPINGS if extra not in BASE_EXTRAS]  # Extras chosen with 50% chance each
+
+
+class VisitBatch:
+    """
+    VisitBatch class holding the outcome of one batched customer visit.
+
+    Every attribute is a NumPy array with one entry per visiting customer.
+
+    Attributes:
+        - customers (ndarray): Population indices of the visiting customers.
+        - sub_ids (ndarray): Index into SUB_IDS of each ordered sub.
+        - sizes (ndarray): Index into SIZE_NAMES of each ordered size.
+        - bread_types (ndarray): Index into BREAD_TYPES of each ordered bread.
+        - extras (ndarray): Boolean matrix of chosen ADDITIONAL_EXTRAS, one row per order.
+        - order_successful (ndarray): Whether each order was sold.
+        - review_scores (ndarray): Review score left by each customer.
+        - returning (ndarray): Whether each customer decided to return.
+    """
+    def __init__(self, customers, sub_ids, sizes, bread_types, extras, order_successful, review_scores, returning):
+        """
+        Initialize a VisitBatch object.
+        """
+        self.customers = customers
+        self.sub_ids = sub_ids
+        self.sizes = sizes
+        self.bread_types = bread_types
+        self.extras = extras
+        self.order_successful = order_successful
+        self.review_scores = review_scores
+        self.returning = returning
+
+    def __len__(self):
+        return len(self.customers)
+
+    def iter_reviews(self, population, start=0, minute=None):
+        """
+        Iterate over the batch as review dictionaries, as CustomerManager stores them.
+
+        Parameters:
+            - population (CustomerPopulation): The population the batch was drawn from.
+            - start (int): Offset of the first visit to include.
+            - minute (int): Minutes after midnight of the visit, recorded in each review (optional).
+
+        Yields:
+            dict: A review with customer name, review score, order success and sub ID.
+        """
+        names = population.customer_names(self.customers[start:])
+        sub_ids = [SUB_IDS[sub_id] for sub_id in self.sub_ids[start:].tolist()]
+        for name, score, successful, sub_id in zip(names, self.review_scores[start:].tolist(),
+                                                   self.order_successful[start:].tolist(), sub_ids):
+            review = {
+                'customer': name,
+                'review_score': score,
+                'order_successful': successful,
+                'sub_id': sub_id
+            }
+            if minute is not None:
+                review['minute'] = minute
+            yield review
+
+
+class CustomerPopulation:
+    """
+    CustomerPopulation class storing every customer as columns of NumPy arrays.
+
+    Row i of every array describes customer i; customers who stop coming back are
+    masked out of `active` rather than removed, so indices stay stable.
+
+    Attributes:
+        - names (list): Distinct customer names.
+        - name_index (ndarray): Index into names for each customer.
+        - mood (ndarray): Mood of each customer.
+        - cleanliness (ndarray): Cleanliness preference of each customer.
+        - customer_service (ndarray): Customer service preference of each customer.
+        - active (ndarray): Whether each customer still visits the shop.
+        - regular (ndarray): Whether each customer has decided to return at least once.
+        - visits (ndarray): Number of visits made by each customer.
+        - rng (Generator): Random generator used for every draw.
+    """
+    def __init__(self, names, name_index, mood, cleanliness, customer_service, rng=None):
+        """
+        Initialize a CustomerPopulation object.
+
+        Parameters:
+            - names (list): Distinct customer names.
+            - name_index (array-like): Index into names for each customer.
+            - mood (array-like): Mood of each customer.
+            - cleanliness (array-like): Cleanliness preference of each customer.
+            - customer_service (array-like): Customer service preference of each customer.
+            - rng (Generator): Random generator to draw from (optional).
+        """
+        self.names = names
+        self.name_index = np.asarray(name_index, dtype=np.int32)
+        self.mood = np.asarray(mood, dtype=np.int16)
+        self.cleanliness = np.asarray(cleanliness, dtype=np.int16)
+        self.customer_service = np.asarray(customer_service, dtype=np.int16)
+        count = len(self.name_index)
+        self.active = np.ones(count, dtype=bool)
+        self.regular = np.zeros(count, dtype=bool)
+        self.visits = np.zeros(count, dtype=np.int32)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def customer_names(self, customers):
+        """
+        Look up the names of several customers.
+
+        Parameters:
+            - customers (ndarray): Population indices.
+
+        Returns:
+            list: The customer names, in the same order.
+        """
+        names = self.names
+        return [names[i] for i in self.name_index[customers].tolist()]
+
+    def draw_orders(self, count):
+        """
+        Draw random orders for several customers at once.
+
+        Parameters:
+            - count (int): The number of orders to draw.
+
+        Returns:
+            tuple: Sub, size and bread indices, and the boolean extras matrix.
+        """
+        sub_ids = self.rng.integers(0, len(SUB_IDS), count)
+        sizes = self.rng.integers(0, len(SIZE_NAMES), count)
+        bread_types = self.rng.integers(0, len(BREAD_TYPES), count)
+        extras = self.rng.random((count, len(ADDITIONAL_EXTRAS))) < 0.5  # 50% chance to add each extra
+        return sub_ids, sizes, bread_types, extras
+
+    def review_experience(self, customers, order_successful, shop_cleanliness, customer_service):
+        """
+        Score the experience of several customers at once.
+
+        Parameters:
+            - customers (ndarray): Population indices of the reviewing customers.
+            - order_successful (ndarray): Whether each order was successful.
+            - shop_cleanliness (int): Cleanliness score of the shop.
+            - customer_service (int): Customer service score of the shop.
+
+        Returns:
+            ndarray: The review scores.
+        """
+        review_scores = self.mood[customers].astype(np.int32)
+        review_scores += np.where(order_successful, 10, -20)
+        review_scores += shop_cleanliness + customer_service
+        return np.clip(review_scores, 0, 100)
+
+    def decide_to_return(self, review_scores):
+        """
+        Decide which customers will return based on their review scores.
+
+        Parameters:
+            - review_scores (ndarray): The review scores.
+
+        Returns:
+            ndarray: True where the customer will return.
+        """
+        return review_scores >= 50
+
+    def fulfil_orders(self, shop, sub_ids, sizes, bread_types):
+        """
+        Sell a batch of orders through the shop in one call, in order.
+
+        Parameters:
+            - shop (Shop): The shop instance.
+            - sub_ids (ndarray): Index into SUB_IDS of each order.
+            - sizes (ndarray): Index into SIZE_NAMES of each order.
+            - bread_types (ndarray): Index into BREAD_TYPES of each order.
+
+        Returns:
+            ndarray: Whether each order was sold.
+        """
+        orders = [(SUB_IDS[sub_id], SIZE_NAMES[size], BREAD_TYPES[bread_type], ())
+                  for sub_id, size, bread_type in zip(sub_ids.tolist(), sizes.tolist(), bread_types.tolist())]
+        results = shop.sell_batch(orders)  # Settle the whole batch, first come first served
+        return np.fromiter((result.success for result in results), dtype=bool, count=len(results))
+
+    def simulate_customers(self, shop, count=None):
+        """
+        Simulate one visit of every active customer, or of `count` of them picked at random, with the shop.
+
+        Toppings are drawn for every order but are not passed on to the shop:
+        none of them are stocked extras, so Shop.sell_sub would ignore them.
+
+        Parameters:
+            - shop (Shop): The shop instance.
+            - count (int): Number of visiting customers; every active customer visits if omitted.
+
+        Returns:
+            VisitBatch: The orders, reviews and return decisions of the visit.
+        """
+        customers = np.flatnonzero(self.active)
+        if count is not None and count < len(customers):
+            customers = self.rng.choice(customers, count, replace=False)  # In order of arrival
+        return self.visit(shop, customers)
+
+    def visit(self, shop, customers):
+        """
+        Simulate one visit of the given customers with the shop, in order.
+
+        Parameters:
+            - shop (Shop): The shop instance.
+            - customers (ndarray): Population indices of the visiting customers.
+
+        Returns:
+            VisitBatch: The orders, reviews and return decisions of the visit.
+        """
+        sub_ids, sizes, bread_types, extras = self.draw_orders(len(customers))
+        order_successful = self.fulfil_orders(shop, sub_ids, sizes, bread_types)
+        review_scores = self.review_experience(customers, order_successful, shop.cleanliness, shop.customer_service)
+        returning = self.decide_to_return(review_scores)
+
+        self.visits[customers] += 1
+        self.regular[customers[returning]] = True
+        self.active[customers[~returning]] = False
+        return VisitBatch(customers, sub_ids, sizes, bread_types, extras, order_successful, review_scores, returning)
+
+
+def draw_preferences(rng, count):
+    """
+    Draw the mood and preferences of new customers.
+
+    Parameters:
+        - rng (Generator): Random generator to draw from.
+        - count (int): Number of customers.
+
+    Returns:
+        tuple: Mood, cleanliness and customer service arrays.
+    """
+    mood = rng.integers(40, 61, count)  # Generate random moods
+    cleanliness = rng.integers(0, 21, count)  # Generate random cleanliness scores
+    customer_service = rng.integers(0, 21, count)  # Generate random customer service scores
+    return mood, cleanliness, customer_service
+
+
+def generate_population(size=None, rng=None):
+    """
+    Generate a random customer population.
+
+    Parameters:
+        - size (int): Number of customers; defaults to one per distinct name in customer_names.txt.
+        - rng (Generator): Random generator to draw from (optional).
+
+    Returns:
+        CustomerPopulation: The generated population.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    names = list(dict.fromkeys(load_customer_names()))  # Distinct names, in file order
+    if size is None:
+        name_index = rng.permutation(len(names))  # Every name once, shuffled
+    else:
+        name_index = rng.integers(0, len(names), size)  # Names repeat in populations larger than the name list
+    mood, cleanliness, customer_service = draw_preferences(rng, len(name_index))
+    return CustomerPopulation(names, name_index, mood, cleanliness, customer_service, rng)
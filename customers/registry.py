@@ -0,0 +1,325 @@
+import hashlib  # Import hashlib to tie a saved registry to the names file it indexes
+import mmap  # Import mmap to read names without loading the file
+import os  # Import os for the atomic replace of the registry file
+import zipfile  # Import zipfile for the error raised by a damaged .npz file
+import numpy as np  # Import NumPy for the line index and the record columns
+from constants import BREAD_TYPES  # Import the bread types to decode logged orders
+from .population import ADDITIONAL_EXTRAS, SIZE_NAMES, SUB_IDS, CustomerPopulation, draw_preferences  # Reuse the batched visit
+
+NAMES_FILE = os.path.join(os.path.dirname(__file__), 'customer_names.txt')  # One potential customer per line
+REGISTRY_FILE = 'customers.npz'  # Saved customer records
+COLUMNS = {
+    'name_index': np.int32,
+    'mood': np.int16,
+    'cleanliness': np.int16,
+    'customer_service': np.int16,
+    'active': bool,
+    'regular': bool,
+    'visits': np.int32,
+}  # Record columns and their types, as in CustomerPopulation
+VISIT_COLUMNS = {
+    'customer': np.int32,
+    'sub_id': np.int8,
+    'size': np.int8,
+    'bread_type': np.int8,
+    'extras': np.int16,
+    'order_successful': bool,
+    'review_score': np.int16,
+}  # Visit log columns, one row per visit in order; customer is a record row, extras a bitmask of ADDITIONAL_EXTRAS
+EXTRA_BITS = 1 << np.arange(len(ADDITIONAL_EXTRAS), dtype=np.int16)  # Bit of each additional extra in the mask
+
+
+class NameFile:
+    """
+    NameFile class giving indexed access to a names file, one name per line, without reading it into memory.
+
+    The file is memory-mapped and the start of every line is found once with a
+    single vectorised scan; a name is decoded only when it is looked up.
+
+    Attributes:
+        - path (str): The names file.
+        - starts (ndarray): Byte offset of each line.
+        - ends (ndarray): Byte offset of the end of each line, excluding the newline.
+    """
+    def __init__(self, path=NAMES_FILE):
+        """
+        Initialize a NameFile object.
+
+        Parameters:
+            - path (str): The names file.
+        """
+        self.path = path
+        self._digest = None
+        with open(path, 'rb') as file:  # The mapping stays valid after the file is closed
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b''
+        ends = np.flatnonzero(np.frombuffer(self._map, dtype=np.uint8) == ord('\n'))
+        if len(self._map) and self._map[-1:] != b'\n':
+            ends = np.append(ends, len(self._map))  # The last line has no newline
+        self.starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)[:len(ends)]  # No lines in an empty file
+        self.ends = ends.astype(np.int64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, i):
+        """
+        Decode the name on line `i`.
+        """
+        i = int(i)
+        return self._map[int(self.starts[i]):int(self.ends[i])].decode('utf-8').rstrip('\r')
+
+    @property
+    def digest(self):
+        """
+        SHA-256 of the file, so saved records are only reused with the names they were created from.
+        """
+        if self._digest is None:
+            self._digest = hashlib.sha256(self._map).hexdigest()
+        return self._digest
+
+
+class CustomerRegistry(CustomerPopulation):
+    """
+    CustomerRegistry class: a customer population created lazily, one potential customer per line of the names file.
+
+    A customer exists only as a line number until their first visit, when
+    their record (mood, preferences, visit count) is drawn and appended to
+    the record columns. Every visit's order and review is appended to the
+    visit log. Creating a registry therefore costs the same whatever the size
+    of the population, and the records and the log can be saved and loaded so
+    the population carries over between sessions. Duplicate lines in the
+    names file are distinct customers who share a name.
+
+    Attributes:
+        - names (NameFile): The potential customers' names.
+        - count (int): Number of customers with a record.
+        - visit_count (int): Number of visits in the visit log.
+        - row_of (ndarray): Record row of each line of the names file, or -1 before the first visit.
+        - dirty (bool): Whether the records changed since they were last saved or loaded.
+        - rng (Generator): Random generator used for every draw.
+    """
+    def __init__(self, names=None, rng=None, capacity=1024):
+        """
+        Initialize an empty CustomerRegistry object.
+
+        Parameters:
+            - names (NameFile): The names file; customer_names.txt if omitted.
+            - rng (Generator): Random generator to draw from (optional).
+            - capacity (int): Number of records to allocate room for up front.
+        """
+        self.names = names if names is not None else NameFile()
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.count = 0
+        self.row_of = np.full(len(self.names), -1, dtype=np.int32)
+        self.dirty = False
+        self._columns = {column: np.zeros(capacity, dtype=dtype) for column, dtype in COLUMNS.items()}
+        self.visit_count = 0
+        self._visits = {column: np.zeros(capacity, dtype=dtype) for column, dtype in VISIT_COLUMNS.items()}
+
+    # The record columns, as CustomerPopulation exposes them: views of the first `count` rows
+    name_index = property(lambda self: self._columns['name_index'][:self.count])
+    mood = property(lambda self: self._columns['mood'][:self.count])
+    cleanliness = property(lambda self: self._columns['cleanliness'][:self.count])
+    customer_service = property(lambda self: self._columns['customer_service'][:self.count])
+    active = property(lambda self: self._columns['active'][:self.count])
+    regular = property(lambda self: self._columns['regular'][:self.count])
+    visits = property(lambda self: self._columns['visits'][:self.count])
+
+    def __len__(self):
+        return len(self.names) - (self.count - int(np.count_nonzero(self.active)))  # Everyone who has not left for good
+
+    @staticmethod
+    def _reserve(columns, used, count):
+        """
+        Grow a set of columns, doubling, until they hold `count` rows, keeping the first `used` rows.
+        """
+        capacity = len(next(iter(columns.values())))
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for column, values in columns.items():
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:used] = values[:used]
+            columns[column] = grown
+
+    def records(self, lines):
+        """
+        Look up the record rows of several customers, creating the records of first-time visitors.
+
+        Parameters:
+            - lines (ndarray): Distinct lines of the names file.
+
+        Returns:
+            ndarray: The record row of each customer, in the same order.
+        """
+        rows = self.row_of[lines]
+        new = rows < 0
+        if not new.any():
+            return rows
+        new_lines = lines[new]
+        start, end = self.count, self.count + len(new_lines)
+        self._reserve(self._columns, self.count, end)
+        columns = self._columns
+        columns['name_index'][start:end] = new_lines
+        mood, cleanliness, customer_service = draw_preferences(self.rng, len(new_lines))
+        columns['mood'][start:end] = mood
+        columns['cleanliness'][start:end] = cleanliness
+        columns['customer_service'][start:end] = customer_service
+        columns['active'][start:end] = True
+        columns['regular'][start:end] = False
+        columns['visits'][start:end] = 0
+        self.count = end
+        self.row_of[new_lines] = rows[new] = np.arange(start, end, dtype=np.int32)
+        return rows
+
+    def arrivals(self, count=None):
+        """
+        Pick the visiting customers among everyone who has not left for good.
+
+        Parameters:
+            - count (int): Number of visiting customers; every potential customer visits if omitted.
+
+        Returns:
+            ndarray: Lines of the names file of the visitors, in order of arrival.
+        """
+        potential = len(self.names)
+        left = self.count - int(np.count_nonzero(self.active))
+        if count is None or count >= potential - left or 2 * left > potential:
+            staying = np.ones(potential, dtype=bool)
+            staying[self.name_index[~self.active]] = False
+            lines = np.flatnonzero(staying)
+            if count is not None and count < len(lines):
+                lines = self.rng.choice(lines, count, replace=False)
+            return lines
+        while True:  # At least half the candidates are still customers, so this rarely repeats
+            lines = self.rng.choice(potential, min(potential, 2 * count + 16), replace=False)
+            rows = self.row_of[lines]
+            known = rows >= 0
+            staying = ~known
+            staying[known] = self.active[rows[known]]
+            lines = lines[staying]
+            if len(lines) >= count:
+                return lines[:count]
+
+    def simulate_customers(self, shop, count=None):
+        """
+        Simulate one visit of `count` customers picked at random, or of every potential customer, with the shop.
+
+        Parameters:
+            - shop (Shop): The shop instance.
+            - count (int): Number of visiting customers; every potential customer visits if omitted.
+
+        Returns:
+            VisitBatch: The orders, reviews and return decisions of the visit.
+        """
+        customers = self.records(self.arrivals(count))
+        if len(customers):
+            self.dirty = True
+        batch = self.visit(shop, customers)
+        self.log_visits(batch)
+        return batch
+
+    def log_visits(self, batch):
+        """
+        Append the orders and reviews of a visit to the visit log.
+
+        Parameters:
+            - batch (VisitBatch): The visit, as returned by visit().
+        """
+        start, end = self.visit_count, self.visit_count + len(batch)
+        self._reserve(self._visits, start, end)
+        log = self._visits
+        log['customer'][start:end] = batch.customers
+        log['sub_id'][start:end] = batch.sub_ids
+        log['size'][start:end] = batch.sizes
+        log['bread_type'][start:end] = batch.bread_types
+        log['extras'][start:end] = batch.extras @ EXTRA_BITS
+        log['order_successful'][start:end] = batch.order_successful
+        log['review_score'][start:end] = batch.review_scores
+        self.visit_count = end
+
+    def visit_history(self, line):
+        """
+        Look up every visit of one customer, oldest first.
+
+        Parameters:
+            - line (int): Line of the names file of the customer.
+
+        Returns:
+            list: One dictionary per visit with the order (sub ID, size, bread type, extras),
+            whether it was sold and the review score.
+        """
+        row = self.row_of[line]
+        if row < 0:
+            return []  # Not a customer yet
+        log = {column: values[:self.visit_count] for column, values in self._visits.items()}
+        visits = np.flatnonzero(log['customer'] == row)
+        return [{
+            'sub_id': SUB_IDS[log['sub_id'][i]],
+            'size': SIZE_NAMES[log['size'][i]],
+            'bread_type': BREAD_TYPES[log['bread_type'][i]],
+            'extras': [extra for extra, bit in zip(ADDITIONAL_EXTRAS, EXTRA_BITS.tolist()) if log['extras'][i] & bit],
+            'order_successful': bool(log['order_successful'][i]),
+            'review_score': int(log['review_score'][i]),
+        } for i in visits.tolist()]
+
+    def save(self, path=REGISTRY_FILE):
+        """
+        Save the customer records and the visit log, atomically replacing any previous save.
+
+        Parameters:
+            - path (str): The registry file.
+
+        Returns:
+            bool: True if the records were written, False if nothing changed since the last save or load.
+        """
+        if not self.dirty:
+            return False
+        columns = {column: values[:self.count] for column, values in self._columns.items()}
+        columns.update((f'visit_{column}', values[:self.visit_count]) for column, values in self._visits.items())
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as file:
+            np.savez(file, names_digest=np.array(self.names.digest), **columns)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+        self.dirty = False
+        return True
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE, names=None, rng=None):
+        """
+        Load saved customer records and their visit log.
+
+        Parameters:
+            - path (str): The registry file.
+            - names (NameFile): The names file; customer_names.txt if omitted.
+            - rng (Generator): Random generator to draw from (optional).
+
+        Returns:
+            CustomerRegistry: The saved population, or None if there is no usable save for these names.
+        """
+        names = names if names is not None else NameFile()
+        try:
+            with np.load(path) as saved:
+                if str(saved['names_digest']) != names.digest:
+                    return None  # Saved against another names file; its line numbers mean other customers
+                columns = {column: saved[column].astype(dtype) for column, dtype in COLUMNS.items()}
+                visits = {column: saved[f'visit_{column}'].astype(dtype) for column, dtype in VISIT_COLUMNS.items()
+                          if f'visit_{column}' in saved.files}  # Saves made before the visit log have none
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        count = len(columns['name_index'])
+        registry = cls(names, rng, max(count, 1024))
+        for column, values in columns.items():
+            registry._columns[column][:count] = values
+        registry.count = count
+        registry.row_of[columns['name_index']] = np.arange(count, dtype=np.int32)
+        if len(visits) == len(VISIT_COLUMNS):
+            visit_count = len(visits['customer'])
+            registry._reserve(registry._visits, 0, visit_count)
+            for column, values in visits.items():
+                registry._visits[column][:visit_count] = values
+            registry.visit_count = visit_count
+        return registry
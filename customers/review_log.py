@@ -0,0 +1,192 @@
+import json  # Import json for the spill-to-disk history
+from collections import deque  # Import deque for the fixed-capacity ring buffer
+import numpy as np  # Import NumPy for batch aggregate updates
+
+
+class ReviewLog:
+    """
+    ReviewLog class keeping recent reviews for display and running aggregates over all of them.
+
+    Memory stays flat however many reviews are recorded: only the newest
+    `capacity` reviews are kept, every aggregate updates in O(1) per review, and
+    the full history can optionally be appended to a JSON-lines file.
+
+    Attributes:
+        - recent (deque): The most recent reviews, oldest first.
+        - count (int): Number of reviews recorded.
+        - mean_score (float): Running mean of the review scores.
+        - successes (int): Number of reviews of successful orders.
+        - sub_counts (dict): Number of reviews per sub ID.
+        - hour_counts (dict): Number of reviews per hour of the day.
+        - spill_path (str): File the full history is appended to, or None.
+    """
+    def __init__(self, capacity=1000, spill_path=None):
+        """
+        Initialize a ReviewLog object.
+
+        Parameters:
+            - capacity (int): Number of recent reviews kept in memory.
+            - spill_path (str): File to append every review to as JSON lines (optional).
+        """
+        self.recent = deque(maxlen=capacity)
+        self.count = 0
+        self.mean_score = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean (Welford)
+        self.successes = 0
+        self.sub_counts = {}
+        self.hour_counts = {}
+        self.spill_path = spill_path
+        self._spill_file = None
+
+    def __len__(self):
+        return len(self.recent)
+
+    def __iter__(self):
+        return iter(self.recent)
+
+    @property
+    def capacity(self):
+        return self.recent.maxlen
+
+    @property
+    def variance(self):
+        """
+        Population variance of the review scores.
+        """
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def success_rate(self):
+        """
+        Fraction of reviews left after a successful order.
+        """
+        return self.successes / self.count if self.count else 0.0
+
+    def append(self, review, minute=None):
+        """
+        Record one review.
+
+        Parameters:
+            - review (dict): The review, with 'review_score', 'order_successful' and optionally 'sub_id'.
+            - minute (int): Minutes after midnight the review was left at (optional).
+        """
+        self.recent.append(review)
+        self.count += 1
+        delta = review['review_score'] - self.mean_score
+        self.mean_score += delta / self.count
+        self._m2 += delta * (review['review_score'] - self.mean_score)
+        if review['order_successful']:
+            self.successes += 1
+        sub_id = review.get('sub_id')
+        if sub_id is not None:
+            self.sub_counts[sub_id] = self.sub_counts.get(sub_id, 0) + 1
+        if minute is not None:
+            hour = minute // 60
+            self.hour_counts[hour] = self.hour_counts.get(hour, 0) + 1
+        if self.spill_path is not None:
+            self._spill([review])
+
+    def extend_batch(self, review_scores, order_successful, sub_ids, sub_labels, make_reviews, minute=None):
+        """
+        Record a whole batch of reviews, updating the aggregates with array operations.
+
+        Only the reviews that fit in the ring buffer are built as dictionaries,
+        unless the full history is being spilled to disk.
+
+        Parameters:
+            - review_scores (ndarray): Review score of each review.
+            - order_successful (ndarray): Whether each order was successful.
+            - sub_ids (ndarray): Index into sub_labels of each ordered sub.
+            - sub_labels (list): Sub ID for each index.
+            - make_reviews (callable): Called with a start offset, returns the batch's review dicts from there on.
+            - minute (int): Minutes after midnight the batch was reviewed at (optional).
+
+        Returns:
+            list: The reviews of the batch that were kept in the ring buffer.
+        """
+        batch_count = len(review_scores)
+        if batch_count == 0:
+            return []
+
+        # Merge the batch mean and spread into the running ones (Chan et al.)
+        batch_mean = float(np.mean(review_scores))
+        batch_m2 = float(np.sum((review_scores - batch_mean) ** 2))
+        total = self.count + batch_count
+        delta = batch_mean - self.mean_score
+        self.mean_score += delta * batch_count / total
+        self._m2 += batch_m2 + delta * delta * self.count * batch_count / total
+        self.count = total
+        self.successes += int(np.count_nonzero(order_successful))
+
+        for index, sub_count in enumerate(np.bincount(sub_ids, minlength=len(sub_labels)).tolist()):
+            if sub_count:
+                sub_id = sub_labels[index]
+                self.sub_counts[sub_id] = self.sub_counts.get(sub_id, 0) + sub_count
+        if minute is not None:
+            hour = minute // 60
+            self.hour_counts[hour] = self.hour_counts.get(hour, 0) + batch_count
+
+        if self.spill_path is not None:
+            reviews = make_reviews(0)
+            self._spill(reviews)
+            reviews = reviews[-self.capacity:]
+        else:
+            reviews = make_reviews(max(0, batch_count - self.capacity))
+        self.recent.extend(reviews)
+        return reviews
+
+    def aggregates(self):
+        """
+        Summarize the aggregates for dashboards, without scanning any reviews.
+
+        Returns:
+            dict: Count, mean, variance, success rate and the per-sub and per-hour histograms.
+        """
+        return {
+            'count': self.count,
+            'mean_score': self.mean_score,
+            'variance': self.variance,
+            'success_rate': self.success_rate,
+            'sub_counts': dict(self.sub_counts),
+            'hour_counts': dict(self.hour_counts),
+        }
+
+    def restore(self, reviews, aggregates):
+        """
+        Replace the recent reviews and the aggregates with saved ones, as aggregates() returned them.
+
+        Parameters:
+            - reviews (list): The saved recent reviews, oldest first.
+            - aggregates (dict): The saved aggregates.
+        """
+        self.recent.clear()
+        self.recent.extend(reviews)
+        self.count = aggregates['count']
+        self.mean_score = aggregates['mean_score']
+        self._m2 = aggregates['variance'] * self.count
+        self.successes = round(aggregates['success_rate'] * self.count)
+        self.sub_counts = dict(aggregates['sub_counts'])
+        self.hour_counts = {int(hour): count for hour, count in aggregates['hour_counts'].items()}  # JSON keys are strings
+
+    def _spill(self, reviews):
+        """
+        Append reviews to the history file as JSON lines.
+        """
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a')
+        self._spill_file.write("".join(json.dumps(review) + "\n" for review in reviews))
+
+    def flush(self):
+        """
+        Flush the history file, if one is open.
+        """
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def close(self):
+        """
+        Close the history file, if one is open.
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
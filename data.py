@@ -1,17 +1,25 @@
 import os
 from dotenv import load_dotenv, find_dotenv
-from icecream import ic
+from tracing import get_channel
 
 # Load the environment variables from the .env file
 load_dotenv(find_dotenv())
 
-# Fetch the 'data' environment variable
+# Fetch the 'data' environment variable, or the path of a vendor export in 'data_file'
 data = os.getenv('data')
+data_file = os.getenv('data_file')
 
-# Print the loaded data for debugging
-ic("Loaded data from .env:", data)
+# Optional SQLite file to record sales, purchases, reviews and shifts to
+history_db = os.getenv('history_db')
+
+# Optional file (.csv or .json) to export the frame profile to on exit
+profile_file = os.getenv('profile_file')
+
+trace = get_channel('data')
+if trace.enabled:
+    trace.debug("Loaded %d characters of data from .env, data_file=%s", len(data or ''), data_file)
 
 # Check if the data variable was fetched correctly
-if data is None:
-    raise ValueError("The 'data' environment variable is not set. Please check your .env file.")
+if data is None and data_file is None:
+    raise ValueError("Neither the 'data' nor the 'data_file' environment variable is set. Please check your .env file.")
 
@@ -1,17 +1,73 @@
+import io
 import re
+from collections import namedtuple
 from decimal import Decimal, InvalidOperation
-from icecream import ic
+from tracing import get_channel
+from accounting import MONEY_DIGITS, RATE_DIGITS, STOCK_DIGITS, from_fixed, to_fixed
+
+trace = get_channel('data')
+
+class ItemFields:
+    """Decimal accessors and formatting shared by Item and inventory rows.
+
+    Subclasses provide product_number, name, vendor_unit and the fixed-point
+    unit_price_mills, price_per_unit_micros and stock_milli fields.
+    """
+    __slots__ = ()
+
+    @property
+    def unit_price(self):
+        return from_fixed(self.unit_price_mills, MONEY_DIGITS)
+
+    @property
+    def price_per_unit(self):
+        return from_fixed(self.price_per_unit_micros, RATE_DIGITS)
+
+    @property
+    def stock(self):
+        return from_fixed(self.stock_milli, STOCK_DIGITS)
+
+    @stock.setter
+    def stock(self, value):
+        self.stock_milli = to_fixed(value, STOCK_DIGITS)
+
+    def __repr__(self):
+        return format_item(self.product_number, self.name, self.unit_price_mills, self.vendor_unit,
+                           self.price_per_unit_micros, self.stock_milli)
+
+def format_item(product_number, name, unit_price_mills, vendor_unit, price_per_unit_micros, stock_milli):
+    unit_price = from_fixed(unit_price_mills, MONEY_DIGITS)
+    price_per_unit = from_fixed(price_per_unit_micros, RATE_DIGITS)
+    stock = from_fixed(stock_milli, STOCK_DIGITS)
+    return (f"Product Number: {product_number}, {name} - ${unit_price:.2f} per {vendor_unit} "
+            f"(${price_per_unit:.3f} per unit, Stock: {stock:.2f} {vendor_unit})")
+
+class Item(ItemFields):
+    __slots__ = ('product_number', 'name', 'unit_price_mills', 'vendor_unit', 'stock_milli', 'price_per_unit_micros')
 
-class Item:
     def __init__(self, product_number, name, unit_price, vendor_unit):
-        ic(f"Creating item: {product_number}, {name}, {unit_price}, {vendor_unit}")
+        if trace.enabled:
+            trace.debug("Creating item: %s, %s, %s, %s", product_number, name, unit_price, vendor_unit)
         self.product_number = product_number
         self.name = name
-        self.unit_price = Decimal(unit_price.replace('$', ''))
+        self.unit_price_mills = to_fixed(unit_price.replace('$', ''), MONEY_DIGITS)
         self.vendor_unit = vendor_unit
-        self.stock = Decimal(0)
-        self.price_per_unit = self.calculate_price_per_unit()
-        ic(self)
+        self.stock_milli = 0
+        self.price_per_unit_micros = to_fixed(self.calculate_price_per_unit(), RATE_DIGITS)
+        if trace.enabled:
+            trace.debug("%r", self)
+
+    @classmethod
+    def from_fixed(cls, product_number, name, unit_price_mills, vendor_unit, price_per_unit_micros):
+        # Rebuild an item from already-parsed fixed-point fields, skipping price parsing
+        item = cls.__new__(cls)
+        item.product_number = product_number
+        item.name = name
+        item.unit_price_mills = unit_price_mills
+        item.vendor_unit = vendor_unit
+        item.stock_milli = 0
+        item.price_per_unit_micros = price_per_unit_micros
+        return item
 
     def calculate_price_per_unit(self):
         parts = self.vendor_unit.split('/')
@@ -24,31 +80,69 @@ class Item:
             total_units = num_units * unit_quantity
             return self.unit_price / total_units
         except (IndexError, ValueError, InvalidOperation) as e:
-            ic(e)
+            if trace.enabled:
+                trace.warning("Cannot compute price per unit of %s: %r", self.product_number, e)
             return self.unit_price
 
-    def __repr__(self):
-        return (f"Product Number: {self.product_number}, {self.name} - ${self.unit_price:.2f} per {self.vendor_unit} "
-                f"(${self.price_per_unit:.3f} per unit, Stock: {self.stock:.2f} {self.vendor_unit})")
-
-def parse_data(data):
-    ic("Parsing data")
-    lines = data.strip().split("\n")
-    items = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if re.match(r'^\d+$', line):
-            try:
-                product_number = line
-                name = lines[i+1].strip()
-                unit_price = lines[i+4].strip()
-                vendor_unit = lines[i+6].strip()
-                items.append(Item(product_number, name, unit_price, vendor_unit))
-                i += 7
-            except IndexError as e:
-                ic(e)
-                i += 1
-        i += 1
-    ic(items)
+PRODUCT_NUMBER = re.compile(r'^\d+$')
+RECORD_LINES = 8  # Product number, name, unit price at +4, vendor unit at +6, one trailing line
+
+ParseDiagnostic = namedtuple('ParseDiagnostic', ['line_number', 'message'])
+
+def _report(diagnostics, line_number, message):
+    if diagnostics is not None:
+        diagnostics.append(ParseDiagnostic(line_number, message))
+    if trace.enabled:
+        trace.warning("Line %d: %s", line_number, message)
+
+def iter_items(source, diagnostics=None):
+    """Parse a vendor export one record at a time, yielding Items.
+
+    `source` is a path or a text file-like object; only one record is held in memory.
+    Skipped lines and records are appended to `diagnostics` as ParseDiagnostic(line_number, message).
+    """
+    if not hasattr(source, 'read'):
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from iter_items(f, diagnostics)
+        return
+
+    lines = iter(source)
+    line_number = 0
+    skipped_from = None
+    for line in lines:
+        line_number += 1
+        product_number = line.strip()
+        if not PRODUCT_NUMBER.match(product_number):
+            if product_number and skipped_from is None:
+                skipped_from = line_number
+            continue
+        if skipped_from is not None:
+            _report(diagnostics, skipped_from, f"Skipped lines {skipped_from}-{line_number - 1} outside any record.")
+            skipped_from = None
+
+        record_start = line_number
+        record = [product_number]
+        for line in lines:
+            line_number += 1
+            record.append(line.strip())
+            if len(record) == RECORD_LINES:
+                break
+        if len(record) < RECORD_LINES - 1:
+            _report(diagnostics, record_start, f"Truncated record for product {product_number}.")
+            continue
+
+        try:
+            yield Item(product_number, record[1], record[4], record[6])
+        except (InvalidOperation, ZeroDivisionError, ValueError) as e:
+            _report(diagnostics, record_start, f"Invalid record for product {product_number}: {e!r}")
+
+    if skipped_from is not None:
+        _report(diagnostics, skipped_from, f"Skipped lines {skipped_from}-{line_number} outside any record.")
+
+def parse_data(data, diagnostics=None):
+    if trace.enabled:
+        trace.info("Parsing data")
+    items = list(iter_items(io.StringIO(data.strip()), diagnostics))
+    if trace.enabled:
+        trace.info("Parsed %d items", len(items))
     return items
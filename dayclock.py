@@ -0,0 +1,121 @@
+import heapq
+import itertools
+
+
+class DayClock:
+    """
+    Non-blocking clock that turns real elapsed time into simulated minutes and fires scheduled events.
+
+    The owner feeds it real time once per frame with advance() and runs the
+    minutes it returns; nothing here ever sleeps. Events are scheduled against
+    simulated minutes and fired by fire_due() as the owner reaches them.
+
+    Attributes:
+        - seconds_per_minute (float): Real seconds per simulated minute at scale 1.
+        - scale (float): Time multiplier; float('inf') runs as many minutes as allowed every frame.
+        - paused (bool): Whether real time is currently ignored.
+        - max_minutes_per_advance (int): Upper bound on minutes returned by one advance() call.
+    """
+    def __init__(self, seconds_per_minute=1.0, scale=1.0, max_minutes_per_advance=660):
+        """
+        Initialize a running DayClock.
+
+        Parameters:
+            - seconds_per_minute (float): Real seconds per simulated minute at scale 1.
+            - scale (float): Time multiplier; float('inf') for as fast as possible.
+            - max_minutes_per_advance (int): Upper bound on minutes returned by one advance() call.
+        """
+        if seconds_per_minute <= 0:
+            raise ValueError("Seconds per minute must be positive.")
+        self.seconds_per_minute = seconds_per_minute
+        self.max_minutes_per_advance = max_minutes_per_advance
+        self.paused = False
+        self.set_scale(scale)
+        self._events = []
+        self._sequence = itertools.count()  # Keeps events at the same minute in scheduling order
+        self._fast_forward = 0
+
+    def set_scale(self, scale):
+        if scale <= 0:
+            raise ValueError("Clock scale must be positive.")
+        self.scale = scale
+        self._accumulator = 0.0
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+
+    def fast_forward(self, minutes):
+        """
+        Run `minutes` extra minutes as fast as possible, even while paused, on the next advance() calls.
+        """
+        self._fast_forward += max(0, minutes)
+
+    def reset(self):
+        """
+        Drop the fractional minute, any pending fast-forward and every scheduled event.
+        """
+        self._accumulator = 0.0
+        self._fast_forward = 0
+        self._events = []
+
+    def advance(self, elapsed):
+        """
+        Account for a slice of real time.
+
+        Parameters:
+            - elapsed (float): Real seconds since the previous call.
+
+        Returns:
+            int: The number of simulated minutes now due.
+        """
+        if self._fast_forward:
+            due = min(self._fast_forward, self.max_minutes_per_advance)
+            self._fast_forward -= due
+            return due
+        if self.paused:
+            return 0
+        if self.scale == float('inf'):
+            return self.max_minutes_per_advance
+
+        self._accumulator += elapsed * self.scale
+        due = int(self._accumulator // self.seconds_per_minute)
+        self._accumulator -= due * self.seconds_per_minute
+        if due > self.max_minutes_per_advance:
+            due = self.max_minutes_per_advance
+            self._accumulator = 0.0  # Drop the backlog instead of stalling the caller
+        return due
+
+    def seconds_until_next_minute(self):
+        """
+        Real seconds until advance() next owes a minute at the current scale, ignoring pauses.
+        """
+        if self._fast_forward or self.scale == float('inf'):
+            return 0.0
+        return max(0.0, (self.seconds_per_minute - self._accumulator) / self.scale)
+
+    def schedule(self, minute, callback, *args):
+        """
+        Call `callback(*args)` once the owner reaches simulated `minute`.
+        """
+        heapq.heappush(self._events, (minute, next(self._sequence), callback, args))
+
+    def fire_due(self, minute):
+        """
+        Fire, in time order, every event scheduled at or before `minute`.
+
+        Returns:
+            int: The number of events fired.
+        """
+        fired = 0
+        events = self._events
+        while events and events[0][0] <= minute:
+            _, _, callback, args = heapq.heappop(events)
+            callback(*args)
+            fired += 1
+        return fired
@@ -0,0 +1,85 @@
+import numpy as np
+
+from engine import CLOSE_TIME, OPEN_TIME
+
+# Expected arrivals per hour at baseline popularity, by hour of the day: lunch and dinner rushes
+DEFAULT_HOURLY_INTENSITY = {
+    10: 20, 11: 45, 12: 90, 13: 70, 14: 30, 15: 25,
+    16: 35, 17: 70, 18: 80, 19: 50, 20: 25,
+}
+
+
+class DemandModel:
+    """
+    Time-of-day demand: Poisson customer arrivals per minute from an hourly intensity curve.
+
+    A whole business day of arrival counts is drawn in one NumPy call when the
+    store opens, scaled by the popularity at opening time; the engine then feeds
+    each minute's count into the order pipeline as one batch.
+
+    Attributes:
+        - hourly_intensity (dict): Expected arrivals per hour at baseline popularity, by hour of the day.
+        - baseline_popularity (int): Popularity at which the intensity curve applies unscaled.
+        - rng (Generator): Random generator used for every draw.
+    """
+    def __init__(self, hourly_intensity=None, baseline_popularity=50, rng=None):
+        """
+        Initialize a DemandModel.
+
+        Parameters:
+            - hourly_intensity (dict): Expected arrivals per hour at baseline popularity (optional).
+            - baseline_popularity (int): Popularity at which the curve applies unscaled.
+            - rng (Generator): Random generator to draw from (optional).
+        """
+        self.hourly_intensity = dict(DEFAULT_HOURLY_INTENSITY if hourly_intensity is None else hourly_intensity)
+        self.baseline_popularity = baseline_popularity
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def minute_rates(self, popularity=None, open_time=OPEN_TIME, close_time=CLOSE_TIME):
+        """
+        Expected arrivals in each minute of the business day.
+
+        Parameters:
+            - popularity (int): Popularity to scale the curve by; the baseline if omitted.
+            - open_time (int): First minute of the day, in minutes after midnight.
+            - close_time (int): Closing minute, in minutes after midnight.
+
+        Returns:
+            ndarray: One rate per minute from open_time to close_time - 1.
+        """
+        minutes = np.arange(open_time, close_time)
+        hourly = np.array([self.hourly_intensity.get(hour, 0) for hour in range(24)], dtype=float)
+        rates = hourly[(minutes // 60) % 24] / 60
+        if popularity is not None:
+            rates *= max(0, popularity) / self.baseline_popularity
+        return rates
+
+    def draw_day(self, popularity, open_time=OPEN_TIME, close_time=CLOSE_TIME):
+        """
+        Draw the number of arrivals in every minute of one business day at once.
+
+        Parameters:
+            - popularity (int): Popularity of the shop when it opens.
+            - open_time (int): First minute of the day, in minutes after midnight.
+            - close_time (int): Closing minute, in minutes after midnight.
+
+        Returns:
+            ndarray: Arrivals per minute from open_time to close_time - 1.
+        """
+        return self.rng.poisson(self.minute_rates(popularity, open_time, close_time))
+
+    def peak(self, popularity=None, window=60, open_time=OPEN_TIME, close_time=CLOSE_TIME):
+        """
+        Find the busiest stretch of the day, for sizing staff and stock.
+
+        Parameters:
+            - popularity (int): Popularity to scale the curve by; the baseline if omitted.
+            - window (int): Length of the stretch in minutes.
+
+        Returns:
+            tuple: Starting minute (after midnight) and expected arrivals of the busiest window.
+        """
+        rates = self.minute_rates(popularity, open_time, close_time)
+        totals = np.convolve(rates, np.ones(window), mode='valid')
+        start = int(np.argmax(totals))
+        return open_time + start, float(totals[start])
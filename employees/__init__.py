@@ -2,3 +2,4 @@
 from .employee import Employee
 from .employee_manager import EmployeeManager
 from .skills import Skill
+from .payroll import Payroll, HOURS_LOGGED
@@ -1,9 +1,13 @@
 import random
 from datetime import datetime, timedelta
 from icecream import ic
+from observable import Observable
 
-class Payroll:
+HOURS_LOGGED = 'hours_logged'  # (employee_id, hours, hourly_rate)
+
+class Payroll(Observable):
     def __init__(self):
+        super().__init__()
         self.employee_hours = {}
         self.hourly_rates = {}
 
@@ -14,6 +18,7 @@ class Payroll:
         if employee_id not in self.employee_hours:
             self.employee_hours[employee_id] = 0
         self.employee_hours[employee_id] += hours
+        self.publish(HOURS_LOGGED, employee_id, hours, self.hourly_rates.get(employee_id, 0))
 
     def calculate_pay(self, employee_id):
         hours = self.employee_hours.get(employee_id, 0)
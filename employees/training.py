@@ -3,6 +3,7 @@ import pygame
 from pygame.locals import *
 from icecream import ic
 from employees.skills import Skill
+from helpers import render_text, load_font
 
 class TrainingProgram:
     def __init__(self, name, required_level, challenge, questions):
@@ -48,11 +49,11 @@ def quiz_challenge(questions, screen):
     return display_quiz_popup(screen, question, options, correct_answer)
 
 def display_quiz_popup(screen, question, options, correct_answer):
-    font = pygame.font.Font(None, 36)
+    font = load_font(None, 36)
     screen.fill((255, 255, 255))
 
     # Display the question
-    question_text = font.render(question, True, (0, 0, 0))
+    question_text = render_text(font, question, (0, 0, 0))
     screen.blit(question_text, (50, 50))
 
     # Define colors for the options
@@ -61,7 +62,7 @@ def display_quiz_popup(screen, question, options, correct_answer):
     for i, option in enumerate(options):
         button_rect = pygame.Rect(50, 150 + i * 50, 200, 40)
         pygame.draw.rect(screen, colors[i], button_rect)
-        option_text = font.render(option, True, (255, 255, 255))
+        option_text = render_text(font, option, (255, 255, 255))
         screen.blit(option_text, (60, 160 + i * 50))
         option_buttons.append((button_rect, option))
 
@@ -0,0 +1,279 @@
+import random
+import time
+from collections import namedtuple
+
+from dayclock import DayClock
+from game_logic import adjust_popularity, generate_customer_order, generate_customer_orders
+from observable import Observable
+
+OPEN_TIME = 10 * 60  # 10:00 AM, in minutes after midnight
+CLOSE_TIME = 21 * 60  # 9:00 PM, in minutes after midnight
+
+REALTIME = 'realtime'
+ACCELERATED = 'accelerated'
+MAX_SPEED = 'max'
+MODES = (REALTIME, ACCELERATED, MAX_SPEED)
+
+MINUTE_ENDED = 'minute_ended'  # Topic published after every open tick with (day, minute)
+
+Snapshot = namedtuple('Snapshot', ['day', 'minute', 'store_open', 'cash', 'popularity', 'ticks'])
+
+
+def format_minute(minute):
+    """
+    Format minutes after midnight the way the time display shows them.
+
+    Parameters:
+        - minute (int): Minutes after midnight.
+
+    Returns:
+        str: The time as "HH:MM AM/PM".
+    """
+    hour, minute = divmod(minute, 60)
+    suffix = "AM" if hour % 24 < 12 else "PM"
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {suffix}"
+
+
+class SimulationEngine(Observable):
+    """
+    Fixed-timestep simulation of the shop, independent of pygame and of the frame rate.
+
+    One tick is one simulated minute of the 10:00 to 21:00 business day. Time
+    is kept by a DayClock: the UI feeds real elapsed time into update() once per
+    frame and reads snapshot(), and the clock can be paused, resumed, rescaled
+    or fast-forwarded without blocking. Store closing is a scheduled clock
+    event. A headless server calls run_days() directly.
+
+    Attributes:
+        - shop (Shop): The shop being simulated.
+        - customer_manager (CustomerManager): Regular customers, simulated every tick (optional).
+        - demand (DemandModel): Draws each day's arrivals per minute (optional).
+        - arrivals (ndarray): Arrivals drawn for each minute of the current day, when demand is set.
+        - mode (str): REALTIME, ACCELERATED or MAX_SPEED.
+        - speed (float): Time multiplier used in ACCELERATED mode.
+        - seconds_per_minute (float): Real seconds per simulated minute at 1x speed.
+        - max_ticks_per_update (int): Upper bound on ticks run by a single update() call.
+        - clock (DayClock): Converts real time into ticks and fires scheduled events.
+    """
+    def __init__(self, shop, customer_manager=None, mode=REALTIME, speed=1, seconds_per_minute=1.0,
+                 max_ticks_per_update=CLOSE_TIME - OPEN_TIME, demand=None):
+        """
+        Initialize a SimulationEngine at the opening of day one.
+
+        Parameters:
+            - shop (Shop): The shop to simulate.
+            - customer_manager (CustomerManager): Customers to simulate every tick (optional).
+            - mode (str): REALTIME, ACCELERATED or MAX_SPEED.
+            - speed (float): Time multiplier used in ACCELERATED mode.
+            - seconds_per_minute (float): Real seconds per simulated minute at 1x speed.
+            - max_ticks_per_update (int): Upper bound on ticks run by a single update() call.
+            - demand (DemandModel): Time-of-day arrivals; without it every customer visits every tick
+              and at most one walk-in order is rolled per tick (optional).
+        """
+        super().__init__()
+        self.shop = shop
+        self.customer_manager = customer_manager
+        self.clock = DayClock(seconds_per_minute, max_minutes_per_advance=max_ticks_per_update)
+        self.set_mode(mode, speed)
+        self.day = 1
+        self.minute = OPEN_TIME
+        self.store_open = True
+        self.popularity = 50
+        self.ticks = 0
+        self.demand = demand
+        self.arrivals = None
+        self._schedule_day()
+
+    @property
+    def seconds_per_minute(self):
+        return self.clock.seconds_per_minute
+
+    @property
+    def max_ticks_per_update(self):
+        return self.clock.max_minutes_per_advance
+
+    def set_mode(self, mode, speed=1):
+        """
+        Switch between real-time, accelerated and as-fast-as-possible simulation.
+
+        Parameters:
+            - mode (str): REALTIME, ACCELERATED or MAX_SPEED.
+            - speed (float): Time multiplier used in ACCELERATED mode.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown simulation mode: {mode}")
+        if speed <= 0:
+            raise ValueError("Simulation speed must be positive.")
+        self.mode = mode
+        self.speed = speed
+        self.clock.set_scale(float('inf') if mode == MAX_SPEED else speed if mode == ACCELERATED else 1)
+
+    def pause(self):
+        self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    @property
+    def paused(self):
+        return self.clock.paused
+
+    def fast_forward(self, minutes=None):
+        """
+        Run the next `minutes` ticks as fast as the frame loop allows, even while paused.
+
+        Parameters:
+            - minutes (int): Minutes to skip ahead, or None for the rest of the day.
+        """
+        if self.store_open:
+            self.clock.fast_forward(CLOSE_TIME - self.minute if minutes is None else minutes)
+
+    def open_day(self):
+        """
+        Open the store for the next business day if it is closed.
+        """
+        if self.store_open:
+            return
+        self.day += 1
+        self.minute = OPEN_TIME
+        self.store_open = True
+        self.clock.reset()
+        self._schedule_day()
+
+    def restore(self, day, minute, store_open, popularity):
+        """
+        Jump to a saved point of a business day, as when a save is loaded.
+
+        The clock's schedule and the day's arrivals are rebuilt for that day,
+        so the store still closes on time.
+
+        Parameters:
+            - day (int): The business day.
+            - minute (int): Minutes after midnight.
+            - store_open (bool): Whether the store is open.
+            - popularity (int): The shop's popularity.
+        """
+        self.day = day
+        self.minute = minute
+        self.store_open = store_open
+        self.popularity = popularity
+        self.clock.reset()
+        if store_open:
+            self._schedule_day()  # A closed store is scheduled again by open_day()
+
+    def _schedule_day(self):
+        self.clock.schedule(CLOSE_TIME, self.close_store)
+        if self.demand is not None:
+            self.arrivals = self.demand.draw_day(self.popularity, OPEN_TIME, CLOSE_TIME).tolist()
+
+    def close_store(self):
+        self.store_open = False
+
+    def tick(self):
+        """
+        Advance the shop by one simulated minute.
+
+        Returns:
+            bool: True if the store is still open after the tick, False otherwise.
+        """
+        if not self.store_open:
+            return False
+
+        self.minute += 1
+        self.ticks += 1
+        self.clock.fire_due(self.minute)
+        if not self.store_open:
+            return False
+
+        if self.demand is not None:
+            arrivals = self.arrivals[self.minute - 1 - OPEN_TIME]  # Arrivals during the minute that just passed
+            if arrivals:
+                if self.customer_manager is not None:
+                    self.customer_manager.simulate_customers(self.shop, self.minute, arrivals)
+                else:
+                    generate_customer_orders(self.shop, arrivals)
+        else:
+            if self.customer_manager is not None:
+                self.customer_manager.simulate_customers(self.shop, self.minute)
+            if random.randint(0, 100) < self.popularity:
+                generate_customer_order(self.shop)
+        self.popularity = adjust_popularity(self.popularity)
+        self.publish(MINUTE_ENDED, self.day, self.minute)
+        return True
+
+    def update(self, elapsed):
+        """
+        Run the ticks owed for a slice of real time.
+
+        Parameters:
+            - elapsed (float): Real seconds since the previous update.
+
+        Returns:
+            int: The number of ticks that were run.
+        """
+        due = self.clock.advance(elapsed)
+        ran = 0
+        while ran < due and self.store_open:
+            self.tick()  # The tick that closes the store is counted too, so callers see the day end
+            ran += 1
+        return ran
+
+    def run_day(self):
+        """
+        Run the current business day to closing as fast as possible.
+
+        Returns:
+            Snapshot: The state of the shop at closing time.
+        """
+        self.open_day()
+        while self.tick():
+            pass
+        return self.snapshot()
+
+    def run_days(self, days):
+        """
+        Run several business days back to back as fast as possible.
+
+        Parameters:
+            - days (int): The number of days to run.
+
+        Returns:
+            Snapshot: The state of the shop after the last day.
+        """
+        for _ in range(days):
+            self.run_day()
+        return self.snapshot()
+
+    def run(self, days=1, clock=time.monotonic, sleep=time.sleep):
+        """
+        Run whole days headless, pacing ticks in wall-clock time unless in MAX_SPEED mode.
+
+        Parameters:
+            - days (int): The number of days to run.
+            - clock (callable): Monotonic clock returning seconds.
+            - sleep (callable): Function used to wait between ticks.
+
+        Returns:
+            Snapshot: The state of the shop after the last day.
+        """
+        if self.mode == MAX_SPEED:
+            return self.run_days(days)
+
+        for _ in range(days):
+            self.open_day()
+            last = clock()
+            while self.store_open:
+                now = clock()
+                self.update(now - last)
+                last = now
+                sleep(self.clock.seconds_until_next_minute())
+        return self.snapshot()
+
+    def snapshot(self):
+        """
+        Take a read-only view of the simulation state for the UI.
+
+        Returns:
+            Snapshot: Day, minute, open flag, cash, popularity and tick count.
+        """
+        return Snapshot(self.day, self.minute, self.store_open, self.shop.cash, self.popularity, self.ticks)
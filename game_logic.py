@@ -2,23 +2,82 @@ from decimal import Decimal, InvalidOperation
 import json
 import os
 import random
+from collections import namedtuple
 
-import pygame
-
+from accounting import MONEY_DIGITS, RATE_STOCK_TO_MONEY, STOCK_DIGITS, STOCK_SCALE, from_fixed, round_div, to_fixed
 from constants import EXTRAS, SIZES, SUBS
 from data_handler import Item
-
-class Shop:
+from inventory import InventoryTable
+from observable import Observable
+
+MARKUP_PERCENT = 150
+
+# Topics published by Shop
+STOCK_CHANGED = 'stock_changed'  # (product_numbers)
+CASH_CHANGED = 'cash_changed'  # (cash_mills)
+INVENTORY_RESET = 'inventory_reset'  # ()
+SALES_MADE = 'sales_made'  # (orders, results): (sub_id, size, bread_type, extras) tuples and their SaleResults
+STOCK_PURCHASED = 'stock_purchased'  # (product_number, quantity_milli, cost_mills)
+
+SaleResult = namedtuple('SaleResult', ['success', 'revenue_mills', 'message'])
+
+class RecipeMatrix:
+    """
+    Ingredient requirements of every (sub, size) pair, compiled once over product numbers.
+
+    Row r of `ingredients` is the sparse form of one matrix row: (column, amount) pairs in recipe order,
+    with amounts in milli-units.
+    """
+
+    def __init__(self, subs, sizes):
+        """
+        Compile the recipes into matrix rows.
+
+        Parameters:
+            - subs (dict): Sub ID to the product numbers of its ingredients.
+            - sizes (dict): Size name to the multiplier applied to every ingredient.
+        """
+        self.products = list(dict.fromkeys(product for ingredients in subs.values() for product in ingredients))
+        self.columns = {product: column for column, product in enumerate(self.products)}
+        self.rows = {}
+        self.ingredients = []
+        self.row_products = []
+        for sub_id, required_ingredients in subs.items():
+            for size, size_multiplier in sizes.items():
+                required_amount = to_fixed(size_multiplier, STOCK_DIGITS)
+                self.rows[sub_id, size] = len(self.ingredients)
+                self.ingredients.append(tuple((self.columns[ingredient], required_amount) for ingredient in required_ingredients))
+                self.row_products.append(tuple(required_ingredients))
+
+RECIPES = RecipeMatrix(SUBS, SIZES)
+
+class Shop(Observable):
     def __init__(self):
-        self.inventory = {}
-        self.cash = Decimal(1000.0)
-        self.product_map = {}
+        super().__init__()
+        self.inventory = InventoryTable()
+        self.cash_mills = to_fixed(1000, MONEY_DIGITS)
         self.cleanliness = 20
         self.customer_service = 20
+        self._recipe_rows = None
+
+    @property
+    def cash(self):
+        return from_fixed(self.cash_mills, MONEY_DIGITS)
+
+    @cash.setter
+    def cash(self, value):
+        self.cash_mills = to_fixed(value, MONEY_DIGITS)
+        self.publish(CASH_CHANGED, self.cash_mills)
+
+    def reset_inventory(self, inventory):
+        self.inventory = inventory
+        self._recipe_rows = None
+        self.publish(INVENTORY_RESET)
 
     def add_item(self, item):
-        self.inventory[item.product_number] = item
-        self.product_map[item.product_number] = item.name
+        self.inventory.add(item)
+        self._recipe_rows = None
+        self.publish(INVENTORY_RESET)
 
     def buy_stock_by_text(self, item_text):
         product_number = item_text.split(',')[0].split(':')[-1].strip()
@@ -26,59 +85,114 @@ class Shop:
         return self.buy_stock(product_number, quantity)
 
     def buy_stock(self, product_number, quantity):
-        if product_number not in self.inventory:
+        inventory = self.inventory
+        row = inventory.row(product_number)
+        if row is None:
             return "Item not found in inventory."
 
         try:
-            quantity = Decimal(quantity)
+            quantity_milli = to_fixed(quantity, STOCK_DIGITS)
         except InvalidOperation:
             return "Invalid quantity."
 
-        item = self.inventory[product_number]
-        cost = item.unit_price * quantity
-        if self.cash < cost:
+        cost_mills = round_div(inventory.unit_price_mills[row] * quantity_milli, STOCK_SCALE)
+        if self.cash_mills < cost_mills:
             return "Not enough cash to buy this stock."
 
-        self.cash -= cost
-        item.stock += quantity
-        return f"Bought {quantity:.2f} {item.vendor_unit} of {item.name} for ${cost:.2f}"
+        self.cash_mills -= cost_mills
+        inventory.stock_milli[row] += quantity_milli
+        self.publish(STOCK_PURCHASED, product_number, quantity_milli, cost_mills)
+        self.publish(STOCK_CHANGED, (product_number,))
+        self.publish(CASH_CHANGED, self.cash_mills)
+        quantity = from_fixed(quantity_milli, STOCK_DIGITS)
+        cost = from_fixed(cost_mills, MONEY_DIGITS)
+        return f"Bought {quantity:.2f} {inventory.vendor_units[row]} of {inventory.names[row]} for ${cost:.2f}"
 
     def sell_sub(self, sub_id, size='REGULAR', bread_type='WHITE', extras=[]):
+        changed = set()
+        result = self._settle_order(self.recipe_rows(), changed, sub_id, size, bread_type, extras)
+        self._publish_sales(((sub_id, size, bread_type, extras),), (result,), changed)
+        return result.message
+
+    def sell_batch(self, orders):
+        """
+        Sell a sequence of orders, exactly as repeated sell_sub calls would.
+
+        Stock and cash are settled order by order, but the sales are published once for the whole batch.
+
+        Parameters:
+            - orders (list): (sub_id, size, bread_type, extras) tuples.
+
+        Returns:
+            list: One SaleResult per order.
+        """
+        rows = self.recipe_rows()
+        changed = set()
+        results = [self._settle_order(rows, changed, sub_id, size, bread_type, extras)
+                   for sub_id, size, bread_type, extras in orders]
+        self._publish_sales(orders, results, changed)
+        return results
+
+    def recipe_rows(self):
+        if self._recipe_rows is None:
+            self._recipe_rows = [self.inventory.row(product) for product in RECIPES.products]
+        return self._recipe_rows
+
+    def _publish_sales(self, orders, results, changed):
+        self.publish(SALES_MADE, orders, results)
+        if changed:
+            self.publish(STOCK_CHANGED, tuple(changed))
+        if any(result.success for result in results):
+            self.publish(CASH_CHANGED, self.cash_mills)
+
+    def _settle_order(self, rows, changed, sub_id, size, bread_type, extras):
         if sub_id not in SUBS:
-            return "Sub ID not found."
+            return SaleResult(False, 0, "Sub ID not found.")
 
-        required_ingredients = SUBS[sub_id]
-        size_multiplier = SIZES[size.upper()]
+        row = RECIPES.rows[sub_id, size.upper()]
+        required_ingredients = RECIPES.ingredients[row]
+        inventory = self.inventory
+        stock = inventory.stock_milli
+        prices = inventory.price_per_unit_micros
         total_price = 0
 
-        for ingredient in required_ingredients:
-            required_amount = Decimal(size_multiplier)
-            if ingredient not in self.inventory or self.inventory[ingredient].stock < required_amount:
-                ingredient_name = self.product_map.get(ingredient, "Unknown Product")
-                return f"Not enough stock of {ingredient_name} to make {size} {bread_type} {sub_id}."
+        for column, required_amount in required_ingredients:
+            item_row = rows[column]
+            if item_row is None or stock[item_row] < required_amount:
+                ingredient_name = inventory.name(RECIPES.products[column], "Unknown Product")
+                return SaleResult(False, 0, f"Not enough stock of {ingredient_name} to make {size} {bread_type} {sub_id}.")
 
-        for ingredient in required_ingredients:
-            required_amount = Decimal(size_multiplier)
-            self.inventory[ingredient].stock -= required_amount
-            total_price += self.inventory[ingredient].price_per_unit * required_amount
+        for column, required_amount in required_ingredients:
+            item_row = rows[column]
+            stock[item_row] -= required_amount
+            total_price += prices[item_row] * required_amount
+        changed.update(RECIPES.row_products[row])
 
         for extra in extras:
             if extra in EXTRAS and random.random() < EXTRAS[extra]:
-                extra_item = self.product_map.get(extra, "Unknown Product")
-                if extra in self.inventory and self.inventory[extra].stock >= 1:
-                    self.inventory[extra].stock -= 1
-                    total_price += self.inventory[extra].price_per_unit
+                extra_row = inventory.row(extra)
+                if extra_row is not None and stock[extra_row] >= STOCK_SCALE:
+                    stock[extra_row] -= STOCK_SCALE
+                    changed.add(extra)
+                    total_price += prices[extra_row] * STOCK_SCALE
                 else:
-                    return f"Not enough stock of {extra_item} to add to {size} {bread_type} {sub_id}."
+                    extra_item = inventory.name(extra, "Unknown Product")
+                    return SaleResult(False, 0, f"Not enough stock of {extra_item} to add to {size} {bread_type} {sub_id}.")
 
-        revenue = total_price * Decimal(1.5)
-        self.cash += revenue
+        revenue_mills = round_div(total_price * MARKUP_PERCENT, 100 * RATE_STOCK_TO_MONEY)
+        self.cash_mills += revenue_mills
 
-        return f"Sold a {size} {bread_type} {sub_id} with extras for ${revenue:.2f}"
+        revenue = from_fixed(revenue_mills, MONEY_DIGITS)
+        return SaleResult(True, revenue_mills, f"Sold a {size} {bread_type} {sub_id} with extras for ${revenue:.2f}")
 
     def show_inventory(self):
-        inventory_list = [str(item) for item in self.inventory.values()]
-        return "\n".join(inventory_list)
+        return "\n".join(self.inventory.format_rows())
+
+    def stock_value(self):
+        return from_fixed(self.inventory.stock_value_mills(), MONEY_DIGITS)
+
+    def low_stock(self, threshold=1):
+        return self.inventory.low_stock(to_fixed(threshold, STOCK_DIGITS))
 
     def save_game(self, filename='savegame.json'):
         data = {
@@ -95,10 +209,12 @@ class Shop:
         with open(filename, 'r') as f:
             data = json.load(f)
         self.cash = Decimal(data['cash'])
-        self.inventory = {k: Item(k, v['name'], v['unit_price'], v['vendor_unit']) for k, v in data['inventory'].items()}
+        inventory = InventoryTable()
         for k, v in data['inventory'].items():
-            self.inventory[k].stock = Decimal(v['stock'])
-            self.product_map[k] = v['name']
+            item = Item(k, v['name'], v['unit_price'], v['vendor_unit'])
+            item.stock = Decimal(v['stock'])
+            inventory.add(item)
+        self.reset_inventory(inventory)
         return True
 
     def adjust_cleanliness(self, amount):
@@ -108,32 +224,19 @@ class Shop:
         self.customer_service = max(0, min(20, self.customer_service + amount))
 
 def begin_day(shop):
-    store_open = True
-    start_time = 10 * 60
-    end_time = 21 * 60
-    current_time = start_time
-
-    popularity = 50
-
-    while store_open:
-        pygame.time.wait(1000)
-        current_time += 1
-
-        if current_time >= end_time:
-            store_open = False
-            return "Store is closed for the day."
-
-        if random.randint(0, 100) < popularity:
-            generate_customer_order(shop)
-
-        popularity = adjust_popularity(popularity)
-
-    return "Day ended."
+    # Fast-forward one business day without blocking on the wall clock
+    from engine import MAX_SPEED, SimulationEngine
+    SimulationEngine(shop, mode=MAX_SPEED).run_day()
+    return "Store is closed for the day."
 
 def generate_customer_order(shop):
     sub_id = random.choice(list(SUBS.keys()))
     quantity = random.randint(1, 5)
     shop.sell_sub(sub_id)
 
+def generate_customer_orders(shop, count):
+    sub_ids = list(SUBS.keys())
+    return shop.sell_batch([(random.choice(sub_ids), 'REGULAR', 'WHITE', []) for _ in range(count)])
+
 def adjust_popularity(popularity):
     return min(100, max(0, popularity + random.randint(-5, 5)))
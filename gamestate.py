@@ -0,0 +1,116 @@
+import os
+
+from autosave import AutosaveService, capture_game, read_autosave, restore_game
+from customers import CustomerManager, CustomerRegistry
+from customers.registry import REGISTRY_FILE
+from demand import DemandModel
+from employees import EmployeeManager, Payroll
+from engine import SimulationEngine
+from game_logic import Shop
+from history import HistoryStore
+from profiler import CUSTOMERS, PhaseProfiler
+from savegame import SaveJournal
+
+
+class GameState:
+    """
+    Everything one game session owns: the shop, its customers and staff, the simulation and the files it saves to.
+
+    main.py and the benchmarks both build their state here, so a benchmark
+    cannot pass on state the game itself does not create.
+    """
+    def __init__(self, items, customer_names=None, save_dir='.', history_db=None, profile_file=None):
+        """
+        Initialize a GameState and start its autosave thread.
+
+        Parameters:
+            - items (list): Catalog items to stock the shop with.
+            - customer_names (NameFile): The names file customers are created from; customer_names.txt if omitted.
+            - save_dir (str): Directory of the journal, the autosave and the customer records.
+            - history_db (str): SQLite file to record the history to (optional).
+            - profile_file (str): File to export the frame profile to on close (optional).
+        """
+        self.shop = Shop()
+        for item in items:
+            self.shop.add_item(item)
+        self.current_input_step = 0
+        self.product_number = ""
+        self.quantity = ""
+        self.return_to_menu = False
+        self.quit_game = False
+        self.popup = None
+        self.customers_path = os.path.join(save_dir, REGISTRY_FILE)
+        self.customer_manager = CustomerManager()
+        self.customer_manager.population = CustomerRegistry(customer_names)
+        self.customer_names = self.customer_manager.population.names
+        self.profiler = PhaseProfiler()
+        self.profile_file = profile_file
+        self.show_profiler = False
+        # Charge customer simulation to its own phase, wherever the engine calls it from
+        self.customer_manager.simulate_customers = self.profiler.wrap(CUSTOMERS, self.customer_manager.simulate_customers)
+        self.day_started = False
+        self.employee_manager = EmployeeManager()
+        self.payroll = Payroll()
+        self.engine = SimulationEngine(self.shop, self.customer_manager, demand=DemandModel())
+        self.journal = SaveJournal(self.shop, self.engine, os.path.join(save_dir, 'savegame'))
+        self.autosave = AutosaveService(
+            lambda: capture_game(self.shop, self.customer_manager, self.employee_manager, self.engine),
+            os.path.join(save_dir, 'autosave.json.gz'))
+        self.autosave.start()
+        self.history = None
+        if history_db:
+            self.history = HistoryStore(history_db)
+            self.history.attach(self.shop, self.customer_manager, self.payroll, self.engine)
+        self.subscriptions = []
+        self.cash_version = None
+
+    def load_game(self):
+        """
+        Restore the saved game from the newest of the save journal and the autosave, or the legacy savegame.json.
+
+        The journal is written every simulated minute but holds only the shop
+        and the clock, so when it is the newer save the reviews, regulars and
+        employees still come from the autosave. Saved customer records are
+        loaded in every case.
+
+        Returns:
+            bool: True if a save was loaded, False if there is none.
+        """
+        state = read_autosave(self.autosave.path)
+        journal_saved_at = self.journal.saved_at()
+        autosave_newer = state is not None and (journal_saved_at is None or state['saved_at'] >= journal_saved_at)
+        if not autosave_newer and self.journal.load():
+            if state is not None:
+                restore_game(state, None, self.customer_manager, self.employee_manager)
+        elif state is not None:
+            restore_game(state, self.shop, self.customer_manager, self.employee_manager, self.engine)
+        elif not self.shop.load_game():
+            return False
+        self.load_customers()
+        return True
+
+    def load_customers(self):
+        """
+        Replace the customers with the saved ones, if there is a usable save.
+
+        Returns:
+            bool: True if saved customers were loaded.
+        """
+        population = CustomerRegistry.load(self.customers_path, self.customer_names)
+        if population is None:
+            return False
+        self.customer_manager.population = population
+        return True
+
+    def save_customers(self):
+        # Only written if customers visited since the last save or load
+        return self.customer_manager.population.save(self.customers_path)
+
+    def close(self):
+        if self.profile_file:
+            self.profiler.export(self.profile_file)
+        self.autosave.stop()
+        self.save_customers()
+        self.journal.close()
+        if self.history is not None:
+            self.history.close()
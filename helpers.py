@@ -1,8 +1,56 @@
+from collections import OrderedDict
+
 import pygame
-from icecream import ic
+from tracing import get_channel
+
+trace = get_channel('events')
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed on (font, text, color, antialias).
+
+    Cached surfaces are shared between callers and must only be blitted, never drawn on.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        text_surf = self.entries.get(key)
+        if text_surf is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return text_surf
+        self.misses += 1
+        text_surf = font.render(text, antialias, color)
+        self.entries[key] = text_surf
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return text_surf
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+TEXT_CACHE = TextCache()
+_FONTS = {}
+
+def load_font(name, size):
+    # Fonts are part of the text cache key, so widgets share one Font per (file, size)
+    font = _FONTS.get((name, size))
+    if font is None:
+        font = _FONTS[name, size] = pygame.font.Font(name, size)
+    return font
 
-def render_text(font, text, color):
-    return font.render(text, True, color)
+def render_text(font, text, color, antialias=True):
+    return TEXT_CACHE.render(font, text, color, antialias)
 
 def center_text_in_rect(surface, text_surf, rect):
     text_rect = text_surf.get_rect(center=rect.center)
@@ -10,7 +58,8 @@ def center_text_in_rect(surface, text_surf, rect):
 
 def handle_mouse_click(rect, event):
     if event.type == pygame.MOUSEBUTTONDOWN and rect.collidepoint(event.pos):
-        ic(handle_mouse_click)
+        if trace.enabled:
+            trace.debug("Mouse click at %s inside %s", event.pos, rect)
         return True
     return False
 
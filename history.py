@@ -0,0 +1,219 @@
+import sqlite3
+from collections import namedtuple
+
+from accounting import MONEY_DIGITS, to_fixed
+from customers import REVIEWS_RECORDED
+from employees import HOURS_LOGGED
+from engine import MINUTE_ENDED
+from game_logic import SALES_MADE, STOCK_PURCHASED
+
+HISTORY_FILE = 'history.sqlite3'
+
+DailyPnl = namedtuple('DailyPnl', ['day', 'revenue_mills', 'purchases_mills', 'labor_mills', 'profit_mills'])
+SubSales = namedtuple('SubSales', ['sub_id', 'sold', 'revenue_mills'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    minute INTEGER,
+    sub_id TEXT NOT NULL,
+    size TEXT NOT NULL,
+    bread_type TEXT NOT NULL,
+    revenue_mills INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sales_day ON sales (day);
+CREATE INDEX IF NOT EXISTS sales_sub_day ON sales (sub_id, day);
+
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    minute INTEGER,
+    product_number TEXT NOT NULL,
+    quantity_milli INTEGER NOT NULL,
+    cost_mills INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS purchases_day ON purchases (day);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    minute INTEGER,
+    customer TEXT NOT NULL,
+    review_score REAL NOT NULL,
+    order_successful INTEGER NOT NULL,
+    sub_id TEXT
+);
+CREATE INDEX IF NOT EXISTS reviews_day ON reviews (day);
+
+CREATE TABLE IF NOT EXISTS shifts (
+    id INTEGER PRIMARY KEY,
+    day INTEGER NOT NULL,
+    employee_id TEXT NOT NULL,
+    hours REAL NOT NULL,
+    rate_mills INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS shifts_day ON shifts (day);
+CREATE INDEX IF NOT EXISTS shifts_employee ON shifts (employee_id);
+"""
+
+
+class HistoryStore:
+    """
+    Optional SQLite history of successful sales, stock purchases, reviews and payroll shifts.
+
+    Events are buffered in memory as they are published and written in one
+    transaction per simulated minute (or on flush()). The database runs in WAL
+    mode with synchronous=NORMAL, so a commit never waits on fsync.
+
+    Attributes:
+        - connection (sqlite3.Connection): The open database.
+        - engine (SimulationEngine): Supplies the day and minute of each event (optional).
+    """
+    def __init__(self, path=HISTORY_FILE):
+        """
+        Open (creating if needed) the history database.
+
+        Parameters:
+            - path (str): Database file, or ':memory:'.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.engine = None
+        self._sales = []
+        self._purchases = []
+        self._reviews = []
+        self._shifts = []
+        self._subscriptions = []
+
+    def attach(self, shop, customer_manager=None, payroll=None, engine=None):
+        """
+        Start recording the events of a game; the engine also triggers a write after every tick.
+        """
+        self.engine = engine
+        subscriptions = [(shop, SALES_MADE, self._record_sales), (shop, STOCK_PURCHASED, self._record_purchase)]
+        if customer_manager is not None:
+            subscriptions.append((customer_manager, REVIEWS_RECORDED, self._record_reviews))
+        if payroll is not None:
+            subscriptions.append((payroll, HOURS_LOGGED, self._record_shift))
+        if engine is not None:
+            subscriptions.append((engine, MINUTE_ENDED, self._minute_ended))
+        for source, topic, callback in subscriptions:
+            source.subscribe(topic, callback)
+        self._subscriptions.extend(subscriptions)
+
+    def detach(self):
+        for source, topic, callback in self._subscriptions:
+            source.unsubscribe(topic, callback)
+        self._subscriptions = []
+        self.engine = None
+
+    def _clock(self):
+        if self.engine is None:
+            return 0, None
+        return self.engine.day, self.engine.minute
+
+    def _record_sales(self, orders, results):
+        day, minute = self._clock()
+        self._sales.extend((day, minute, sub_id, size, bread_type, result.revenue_mills)
+                           for (sub_id, size, bread_type, extras), result in zip(orders, results) if result.success)
+
+    def _record_purchase(self, product_number, quantity_milli, cost_mills):
+        day, minute = self._clock()
+        self._purchases.append((day, minute, product_number, quantity_milli, cost_mills))
+
+    def _record_reviews(self, reviews):
+        day, minute = self._clock()
+        self._reviews.extend((day, review.get('minute', minute), review['customer'], review['review_score'],
+                              review['order_successful'], review.get('sub_id')) for review in reviews)
+
+    def _record_shift(self, employee_id, hours, hourly_rate):
+        day, minute = self._clock()
+        self._shifts.append((day, str(employee_id), hours, to_fixed(hourly_rate, MONEY_DIGITS)))
+
+    def _minute_ended(self, day, minute):
+        self.flush()
+
+    def flush(self):
+        """
+        Write every buffered event in a single transaction.
+        """
+        if not (self._sales or self._purchases or self._reviews or self._shifts):
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO sales (day, minute, sub_id, size, bread_type, revenue_mills) "
+                "VALUES (?, ?, ?, ?, ?, ?)", self._sales)
+            self.connection.executemany(
+                "INSERT INTO purchases (day, minute, product_number, quantity_milli, cost_mills) "
+                "VALUES (?, ?, ?, ?, ?)", self._purchases)
+            self.connection.executemany(
+                "INSERT INTO reviews (day, minute, customer, review_score, order_successful, sub_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)", self._reviews)
+            self.connection.executemany(
+                "INSERT INTO shifts (day, employee_id, hours, rate_mills) VALUES (?, ?, ?, ?)", self._shifts)
+        self._sales = []
+        self._purchases = []
+        self._reviews = []
+        self._shifts = []
+
+    def daily_pnl(self, first_day=None, last_day=None):
+        """
+        Profit and loss per day, in mills: sales revenue minus stock purchases and labor.
+
+        Parameters:
+            - first_day (int): First day to include (optional).
+            - last_day (int): Last day to include (optional).
+
+        Returns:
+            list: A DailyPnl per day with any recorded activity, in day order.
+        """
+        self.flush()
+        first_day = -1 if first_day is None else first_day
+        last_day = 1 << 62 if last_day is None else last_day
+        rows = self.connection.execute("""
+            WITH totals AS (
+                SELECT day, SUM(revenue_mills) AS revenue, 0 AS purchases, 0 AS labor
+                FROM sales WHERE day BETWEEN ?1 AND ?2 GROUP BY day
+                UNION ALL
+                SELECT day, 0, SUM(cost_mills), 0
+                FROM purchases WHERE day BETWEEN ?1 AND ?2 GROUP BY day
+                UNION ALL
+                SELECT day, 0, 0, CAST(ROUND(SUM(hours * rate_mills)) AS INTEGER)
+                FROM shifts WHERE day BETWEEN ?1 AND ?2 GROUP BY day
+            )
+            SELECT day, SUM(revenue), SUM(purchases), SUM(labor) FROM totals GROUP BY day ORDER BY day
+        """, (first_day, last_day))
+        return [DailyPnl(day, revenue, purchases, labor, revenue - purchases - labor)
+                for day, revenue, purchases, labor in rows]
+
+    def sales_by_sub(self, first_day=None, last_day=None):
+        """
+        Subs sold and revenue per sub, best sellers first.
+
+        Parameters:
+            - first_day (int): First day to include (optional).
+            - last_day (int): Last day to include (optional).
+
+        Returns:
+            list: A SubSales per sub.
+        """
+        self.flush()
+        first_day = -1 if first_day is None else first_day
+        last_day = 1 << 62 if last_day is None else last_day
+        rows = self.connection.execute("""
+            SELECT sub_id, COUNT(*), SUM(revenue_mills)
+            FROM sales WHERE day BETWEEN ? AND ?
+            GROUP BY sub_id ORDER BY SUM(revenue_mills) DESC, sub_id
+        """, (first_day, last_day))
+        return [SubSales(*row) for row in rows]
+
+    def close(self):
+        """
+        Write the buffered events, stop recording and close the database.
+        """
+        self.detach()
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,172 @@
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+from accounting import STOCK_SCALE, round_div
+from data_handler import ItemFields, format_item
+
+
+class ItemRow(ItemFields):
+    """
+    Lightweight view of one inventory row with the same attribute API as Item.
+
+    Reads and stock writes go straight to the table's columns; a view holds no data of its own.
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def product_number(self):
+        return self._table.product_numbers[self._row]
+
+    @property
+    def name(self):
+        return self._table.names[self._row]
+
+    @property
+    def vendor_unit(self):
+        return self._table.vendor_units[self._row]
+
+    @property
+    def unit_price_mills(self):
+        return self._table.unit_price_mills[self._row]
+
+    @property
+    def price_per_unit_micros(self):
+        return self._table.price_per_unit_micros[self._row]
+
+    @property
+    def stock_milli(self):
+        return self._table.stock_milli[self._row]
+
+    @stock_milli.setter
+    def stock_milli(self, value):
+        self._table.stock_milli[self._row] = value
+
+
+class InventoryTable(Mapping):
+    """
+    Inventory stored as contiguous columns, one row per product, in insertion order.
+
+    Behaves like the old product number -> Item dict: lookups return ItemRow views.
+    Hot paths index the columns directly by row; whole-inventory queries run as
+    NumPy passes over the integer columns.
+
+    Attributes:
+        - product_numbers, names, vendor_units (list): String columns.
+        - unit_price_mills, price_per_unit_micros, stock_milli (array): Fixed-point integer columns.
+        - index (dict): Row of each product number.
+    """
+    def __init__(self, items=()):
+        self.product_numbers = []
+        self.names = []
+        self.vendor_units = []
+        self.unit_price_mills = array('q')
+        self.price_per_unit_micros = array('q')
+        self.stock_milli = array('q')
+        self.index = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """
+        Add an Item, or overwrite the row of an existing product number with it.
+
+        Returns:
+            int: The item's row.
+        """
+        row = self.index.get(item.product_number)
+        if row is None:
+            row = self.index[item.product_number] = len(self.product_numbers)
+            self.product_numbers.append(item.product_number)
+            self.names.append(item.name)
+            self.vendor_units.append(item.vendor_unit)
+            self.unit_price_mills.append(item.unit_price_mills)
+            self.price_per_unit_micros.append(item.price_per_unit_micros)
+            self.stock_milli.append(item.stock_milli)
+        else:
+            self.names[row] = item.name
+            self.vendor_units[row] = item.vendor_unit
+            self.unit_price_mills[row] = item.unit_price_mills
+            self.price_per_unit_micros[row] = item.price_per_unit_micros
+            self.stock_milli[row] = item.stock_milli
+        return row
+
+    def __len__(self):
+        return len(self.product_numbers)
+
+    def __iter__(self):
+        return iter(self.product_numbers)
+
+    def __contains__(self, product_number):
+        return product_number in self.index
+
+    def __getitem__(self, product_number):
+        return ItemRow(self, self.index[product_number])
+
+    def row(self, product_number):
+        """
+        Return the row of `product_number`, or None if it is not stocked.
+        """
+        return self.index.get(product_number)
+
+    def name(self, product_number, default=None):
+        row = self.index.get(product_number)
+        return default if row is None else self.names[row]
+
+    def _column(self, column):
+        # Zero-copy NumPy view; it must not outlive the call, since appending to an exported array fails
+        return np.frombuffer(column, dtype=np.int64) if len(column) else np.zeros(0, dtype=np.int64)
+
+    def stock_value_mills(self):
+        """
+        Value of all stock at the vendor's unit prices, in mills.
+        """
+        value = int(np.dot(self._column(self.stock_milli), self._column(self.unit_price_mills)))
+        return round_div(value, STOCK_SCALE)
+
+    def low_stock(self, threshold_milli):
+        """
+        Return the product numbers whose stock is below `threshold_milli`, in row order.
+        """
+        rows = np.flatnonzero(self._column(self.stock_milli) < threshold_milli)
+        return [self.product_numbers[row] for row in rows.tolist()]
+
+    def format_rows(self):
+        """
+        Return the display line of every row, in row order.
+        """
+        return list(map(format_item, self.product_numbers, self.names, self.unit_price_mills,
+                        self.vendor_units, self.price_per_unit_micros, self.stock_milli))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        Build a table from columns shaped like copy_columns() returns them (lists work for the integer columns too).
+        """
+        table = cls()
+        table.product_numbers = list(columns['product_numbers'])
+        table.names = list(columns['names'])
+        table.vendor_units = list(columns['vendor_units'])
+        table.unit_price_mills = array('q', columns['unit_price_mills'])
+        table.price_per_unit_micros = array('q', columns['price_per_unit_micros'])
+        table.stock_milli = array('q', columns['stock_milli'])
+        table.index = {product_number: row for row, product_number in enumerate(table.product_numbers)}
+        return table
+
+    def copy_columns(self):
+        """
+        Return a copy of every column, keyed by column name; a memcpy per column, no per-row work.
+        """
+        return {
+            'product_numbers': self.product_numbers[:],
+            'names': self.names[:],
+            'vendor_units': self.vendor_units[:],
+            'unit_price_mills': self.unit_price_mills[:],
+            'price_per_unit_micros': self.price_per_unit_micros[:],
+            'stock_milli': self.stock_milli[:],
+        }
@@ -1,11 +1,11 @@
 import pygame
-from ui_elements import initialize_ui_elements, handle_events, draw_ui_elements
-from data_handler import parse_data
-from data import data
-from game_logic import Shop
-from customers import CustomerManager, generate_customers
+from ui_elements import initialize_ui_elements, handle_events, update_game_state, ui_widgets, DirtyRectRenderer
+from catalog_cache import load_catalog, load_catalog_file
+from data import data, data_file, history_db, profile_file
+from gamestate import GameState
+from profiler import EVENTS
+from customers import NameFile
 from constants import BUTTON_WIDTH, BUTTON_HEIGHT, WHITE
-from icecream import ic
 from ui_elements.buttons import Button
 from ui_elements.scrollable_text import ScrollableText
 from ui_elements.info_box import InfoBox
@@ -13,8 +13,8 @@ from ui_elements.dropdown_menu import DropdownMenu
 from ui_elements.popup import Popup
 from ui_elements.ui_helpers import display_message
 from utils import draw_rounded_rect
-from helpers import render_text, center_text_in_rect, handle_mouse_click
-from employees import EmployeeManager, Skill
+from helpers import render_text, center_text_in_rect, handle_mouse_click, load_font
+from employees import Skill
 
 pygame.init()
 
@@ -27,45 +27,34 @@ background_image = pygame.image.load('jm_background.png')
 background_image = pygame.transform.scale(background_image, screen.get_size())
 
 # Set up the font and screen dimensions
-FONT = pygame.font.Font('Montserrat-Regular.ttf', 36)
+FONT = load_font('Montserrat-Regular.ttf', 36)
 info = pygame.display.Info()
 SCREEN_WIDTH = info.current_w
 SCREEN_HEIGHT = info.current_h
 
-# Parse data
-items = parse_data(data)
-
-class GameState:
-    def __init__(self, items):
-        self.shop = Shop()
-        for item in items:
-            self.shop.add_item(item)
-        self.current_input_step = 0
-        self.product_number = ""
-        self.quantity = ""
-        self.return_to_menu = False
-        self.quit_game = False
-        self.popup = None
-        self.customer_manager = CustomerManager()
-        self.customer_manager.customers = generate_customers()
-        self.day_started = False
-        self.employee_manager = EmployeeManager()
-        self.clickable_inventory_items = []
-
-game_state = GameState(items)
+# Load the catalog, reparsing the vendor data only when it changed
+items = load_catalog_file(data_file) if data_file else load_catalog(data)
+
+# Index the customer names once; customers are only created as they first visit
+customer_names = NameFile()
+
+game_state = GameState(items, customer_names, history_db=history_db, profile_file=profile_file)
 
 def start_new_game():
     global game_state
-    game_state = GameState(items)
+    game_state.close()
+    game_state = GameState(items, customer_names, history_db=history_db, profile_file=profile_file)
     initialize_ui_elements(SCREEN_WIDTH, SCREEN_HEIGHT, FONT, game_state, exit_to_menu, start_day)
     game_loop()
+    menu_renderer.invalidate()  # The game drew over the menu
 
 def load_saved_game():
-    if not game_state.shop.load_game():
+    if not game_state.load_game():
         display_message(screen, "Save file not found.", FONT, SCREEN_WIDTH, SCREEN_HEIGHT)
     else:
         initialize_ui_elements(SCREEN_WIDTH, SCREEN_HEIGHT, FONT, game_state, exit_to_menu, start_day)
         game_loop()
+    menu_renderer.invalidate()  # The message or the game drew over the menu
 
 def exit_to_menu():
     game_state.return_to_menu = True
@@ -74,6 +63,7 @@ def quit_game():
     game_state.quit_game = True
 
 def start_day():
+    game_state.engine.open_day()
     game_state.day_started = True
 
 button_x = SCREEN_WIDTH // 4 - BUTTON_WIDTH // 2
@@ -86,39 +76,39 @@ buttons = [
 
 initialize_ui_elements(SCREEN_WIDTH, SCREEN_HEIGHT, FONT, game_state, exit_to_menu, start_day)
 
+# Anything that draws to the screen outside this renderer must invalidate() it before the menu shows again
+menu_renderer = DirtyRectRenderer(screen, background_image)
+
 def startup_scene():
     running = True
+    renderer = menu_renderer
+    renderer.invalidate()
     while running:
-        screen.blit(background_image, (0, 0))  # Draw the background image
         events = pygame.event.get()
         running = handle_events(buttons, events, game_state)
         if game_state.quit_game:
             return False
-        for button in buttons:
-            button.draw(screen)
-        pygame.display.flip()
+        drew = renderer.render(buttons)
+        renderer.tick(drew or bool(events))
     return True
 
 def game_loop():
     running = True
+    profiler = game_state.profiler
+    renderer = DirtyRectRenderer(screen, background_image, profiler=profiler)
+    elapsed = 0
     while running:
-        screen.blit(background_image, (0, 0))  # Draw the background image
+        profiler.begin_frame()
+        start = profiler.now()
         events = pygame.event.get()
         running = handle_events([], events, game_state)
+        profiler.add(EVENTS, start)
         if not running or game_state.return_to_menu:
             break
-        if game_state.day_started:
-            game_state.customer_manager.simulate_customers(game_state.shop)
-        current_inventory = game_state.shop.show_inventory()
-        if current_inventory != '\n'.join(game_state.inventory_display.texts):
-            game_state.inventory_display.add_text(current_inventory)
-        reviews = game_state.customer_manager.show_reviews()
-        if reviews != '\n'.join(game_state.scrollable_text.texts):
-            game_state.scrollable_text.add_text(reviews)
-        draw_ui_elements(screen, game_state)
-        if game_state.popup:
-            game_state.popup.draw(screen)
-        pygame.display.flip()
+        update_game_state(game_state, elapsed)
+        drew = renderer.render(ui_widgets(game_state))
+        profiler.end_frame()
+        elapsed = renderer.tick(drew or bool(events) or game_state.day_started) / 1000
 
     if game_state.return_to_menu:
         if not startup_scene():
@@ -128,3 +118,4 @@ def game_loop():
 
 if startup_scene():
     pygame.quit()
+game_state.close()
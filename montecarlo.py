@@ -0,0 +1,192 @@
+import argparse
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from accounting import MONEY_DIGITS, from_fixed, to_fixed
+from customers import CustomerManager, generate_population
+from demand import DemandModel
+from engine import MAX_SPEED, SimulationEngine
+from game_logic import SALES_MADE, Shop
+
+Scenario = namedtuple('Scenario', ['name', 'days', 'stock_order', 'cash', 'population_size', 'hourly_intensity'],
+                      defaults=(30, 10, 1000, 2000, None))
+
+RunResult = namedtuple('RunResult', ['scenario', 'run', 'cash_mills', 'profit_mills', 'stock_value_mills',
+                                     'sold', 'stockouts', 'review_mean', 'reviews'])
+
+METRICS = ('cash_mills', 'profit_mills', 'stock_value_mills', 'sold', 'stockouts', 'review_mean')
+
+_worker_items = None
+
+
+def _init_worker(items):
+    # Each worker receives the parsed catalog once instead of with every run
+    global _worker_items
+    _worker_items = items
+
+
+def run_scenario(items, scenario, seed, run=0):
+    """
+    Simulate one run of a scenario headless, as fast as possible.
+
+    Parameters:
+        - items (list): Catalog items to stock the shop with.
+        - scenario (Scenario): The parameters of the run.
+        - seed (SeedSequence): Seeds every random draw of the run.
+        - run (int): Index of the run within its scenario.
+
+    Returns:
+        RunResult: Final cash, profit, stock value, orders sold and missed, and the mean review.
+    """
+    numpy_seed, demand_seed, python_seed = seed.spawn(3)
+    random.seed(int(python_seed.generate_state(1)[0]))  # game_logic draws extras and popularity from random
+
+    shop = Shop()
+    for item in items:
+        shop.add_item(item)
+    shop.cash = scenario.cash
+    stock_order = scenario.stock_order
+    for product_number in list(shop.inventory):
+        quantity = stock_order.get(product_number, 0) if isinstance(stock_order, dict) else stock_order
+        if quantity:
+            shop.buy_stock(product_number, quantity)
+
+    customer_manager = CustomerManager(review_capacity=1)
+    customer_manager.population = generate_population(scenario.population_size, np.random.default_rng(numpy_seed))
+    demand = DemandModel(scenario.hourly_intensity, rng=np.random.default_rng(demand_seed))
+    engine = SimulationEngine(shop, customer_manager, mode=MAX_SPEED, demand=demand)
+
+    tally = [0, 0]
+
+    def count_sales(orders, results):
+        sold = sum(1 for result in results if result.success)
+        tally[0] += sold
+        tally[1] += len(results) - sold
+
+    shop.subscribe(SALES_MADE, count_sales)
+    engine.run_days(scenario.days)
+
+    starting_cash_mills = to_fixed(scenario.cash, MONEY_DIGITS)
+    reviews = customer_manager.reviews
+    return RunResult(scenario.name, run, shop.cash_mills, shop.cash_mills - starting_cash_mills,
+                     shop.inventory.stock_value_mills(), tally[0], tally[1], reviews.mean_score, reviews.count)
+
+
+def _run_in_worker(scenario, seed, run):
+    return run_scenario(_worker_items, scenario, seed, run)
+
+
+def iter_runs(items, scenarios, runs, seed=0, workers=None):
+    """
+    Fan `runs` independent runs of every scenario out over a process pool, yielding results as they finish.
+
+    Run i of every scenario gets the same child seed, so scenarios are compared
+    on the same customers and arrivals, and a given (seed, run) always
+    reproduces the same result regardless of the number of workers.
+
+    Parameters:
+        - items (list): Catalog items to stock the shop with.
+        - scenarios (list): The Scenarios to compare.
+        - runs (int): Runs per scenario.
+        - seed (int): Root seed of the whole experiment.
+        - workers (int): Worker processes; every core if omitted.
+
+    Yields:
+        RunResult: One result per run, in completion order.
+    """
+    run_seeds = np.random.SeedSequence(seed).spawn(runs)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(items,)) as executor:
+        futures = [executor.submit(_run_in_worker, scenario, run_seed, run)
+                   for run, run_seed in enumerate(run_seeds) for scenario in scenarios]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class RunningStats:
+    """
+    Streaming count, mean, variance, minimum and maximum of one metric (Welford's algorithm).
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def stdev(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    @property
+    def stderr(self):
+        return self.stdev / math.sqrt(self.count) if self.count else 0.0
+
+
+def summarize(results):
+    """
+    Reduce a stream of RunResults into per-scenario statistics without keeping the runs.
+
+    Returns:
+        dict: Scenario name -> metric name -> RunningStats.
+    """
+    summary = {}
+    for result in results:
+        stats = summary.get(result.scenario)
+        if stats is None:
+            stats = summary[result.scenario] = {metric: RunningStats() for metric in METRICS}
+        for metric in METRICS:
+            stats[metric].add(getattr(result, metric))
+    return summary
+
+
+def format_summary(summary):
+    lines = []
+    for name, stats in summary.items():
+        profit = stats['profit_mills']
+        lines.append(
+            f"{name}: {profit.count} runs, profit ${from_fixed(round(profit.mean), MONEY_DIGITS):.2f}"
+            f" ± {from_fixed(round(profit.stderr), MONEY_DIGITS):.2f}"
+            f" (min ${from_fixed(round(profit.minimum), MONEY_DIGITS):.2f},"
+            f" max ${from_fixed(round(profit.maximum), MONEY_DIGITS):.2f}),"
+            f" sold {stats['sold'].mean:.1f}, stockouts {stats['stockouts'].mean:.1f},"
+            f" review {stats['review_mean'].mean:.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare stock orders over many simulated runs.")
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cash', type=int, default=1000)
+    parser.add_argument('--population', type=int, default=2000)
+    parser.add_argument('--stock', type=float, nargs='+', default=[0, 5, 10, 20],
+                        help="Units of every product to buy before the first day, one scenario each")
+    args = parser.parse_args()
+
+    from catalog_cache import load_catalog, load_catalog_file
+    from data import data, data_file
+    items = load_catalog_file(data_file) if data_file else load_catalog(data)
+
+    scenarios = [Scenario(f"stock {quantity:g}", args.days, quantity, args.cash, args.population)
+                 for quantity in args.stock]
+    print(format_summary(summarize(iter_runs(items, scenarios, args.runs, args.seed, args.workers))))
+
+
+if __name__ == '__main__':
+    main()
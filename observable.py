@@ -0,0 +1,44 @@
+class Observable:
+    """
+    Observable mixin that publishes change events to subscribers.
+
+    Every topic has a version counter that is bumped on each publish, so readers
+    that poll can tell whether anything changed without comparing contents.
+    """
+    def __init__(self):
+        self._subscribers = {}
+        self._versions = {}
+
+    def subscribe(self, topic, callback):
+        """
+        Call `callback` with the event arguments whenever `topic` is published.
+        """
+        self._subscribers.setdefault(topic, []).append(callback)
+
+    def unsubscribe(self, topic, callback):
+        """
+        Stop calling `callback` for `topic`.
+        """
+        callbacks = self._subscribers.get(topic)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def has_subscribers(self, topic):
+        """
+        Tell whether anything listens to `topic`, so costly event arguments can be skipped when nothing does.
+        """
+        return bool(self._subscribers.get(topic))
+
+    def publish(self, topic, *args):
+        """
+        Bump the version of `topic` and notify its subscribers.
+        """
+        self._versions[topic] = self._versions.get(topic, 0) + 1
+        for callback in self._subscribers.get(topic, ()):
+            callback(*args)
+
+    def version(self, topic):
+        """
+        Return how many times `topic` has been published.
+        """
+        return self._versions.get(topic, 0)
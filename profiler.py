@@ -0,0 +1,116 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+PROFILE_EXPORT_FILE = 'profile.csv'
+PERCENTILES = (50, 95, 99)
+
+# Phases of one game_loop frame, in display order; nested phases are counted inside their parents too
+EVENTS = 'events'
+SIMULATION = 'simulation'
+CUSTOMERS = 'simulate_customers'
+UI_SYNC = 'ui_sync'
+DRAW = 'draw'
+FLIP = 'flip'
+FRAME = 'frame'
+PHASES = (EVENTS, SIMULATION, CUSTOMERS, UI_SYNC, DRAW, FLIP, FRAME)
+
+
+class PhaseProfiler:
+    """
+    Per-frame timings of the game loop phases, with rolling percentiles over the last `window` frames.
+
+    Call sites take a start time with now() and hand it back to add() when the
+    phase ends; a phase hit several times in a frame is summed. Timings are
+    integer nanoseconds from the monotonic perf counter. When disabled, every
+    call returns immediately.
+    """
+    def __init__(self, window=600, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.frames = 0
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES}
+        self._current = dict.fromkeys(PHASES, 0)
+        self._frame_start = None
+
+    now = staticmethod(time.perf_counter_ns)
+
+    def add(self, phase, start):
+        """
+        Charge the time since `start` (from now()) to `phase` in the current frame.
+        """
+        if self.enabled:
+            self._current[phase] = self._current.get(phase, 0) + time.perf_counter_ns() - start
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        current = self._current
+        current[FRAME] = time.perf_counter_ns() - self._frame_start
+        for phase, elapsed in current.items():
+            samples = self.samples.get(phase)
+            if samples is None:
+                samples = self.samples[phase] = deque(maxlen=self.window)
+            samples.append(elapsed)
+            current[phase] = 0
+        self.frames += 1
+        self._frame_start = None
+
+    def wrap(self, phase, function):
+        """
+        Return `function` timed as `phase` on every call.
+        """
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add(phase, start)
+        return timed
+
+    def stats(self):
+        """
+        Rolling per-frame statistics of every phase, in milliseconds.
+
+        Returns:
+            dict: Phase -> {'p50', 'p95', 'p99', 'mean', 'max', 'samples'}.
+        """
+        stats = {}
+        for phase, samples in self.samples.items():
+            if not samples:
+                continue
+            values = np.fromiter(samples, dtype=np.int64, count=len(samples)) / 1e6
+            row = {f"p{percentile}": float(value)
+                   for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+            row.update(mean=float(values.mean()), max=float(values.max()), samples=len(values))
+            stats[phase] = row
+        return stats
+
+    def export(self, path=PROFILE_EXPORT_FILE):
+        """
+        Write the current statistics to a .json file, or to CSV for any other extension.
+        """
+        stats = self.stats()
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'frames': self.frames, 'window': self.window, 'phases': stats}, f, indent=2)
+            return
+        columns = [f"p{percentile}" for percentile in PERCENTILES] + ['mean', 'max', 'samples']
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['phase'] + columns)
+            for phase, row in stats.items():
+                writer.writerow([phase] + [row[column] for column in columns])
+
+    def format_lines(self):
+        lines = [f"{'phase':18s} {'p50':>7s} {'p95':>7s} {'p99':>7s}  ms"]
+        for phase, row in self.stats().items():
+            lines.append(f"{phase:18s} {row['p50']:7.2f} {row['p95']:7.2f} {row['p99']:7.2f}")
+        return lines
@@ -0,0 +1,259 @@
+import json
+import os
+import uuid
+
+from game_logic import CASH_CHANGED, INVENTORY_RESET, STOCK_CHANGED
+from inventory import InventoryTable
+from tracing import get_channel
+
+trace = get_channel('data')
+
+SAVE_PATH = 'savegame'
+SNAPSHOT_SUFFIX = '.snapshot.json'
+JOURNAL_SUFFIX = '.journal'
+
+
+class SaveJournal:
+    """
+    Saves a shop as a compact snapshot plus an append-only journal of state deltas.
+
+    The journal listens to the shop's change events and only remembers which
+    products and values changed. save() appends one JSON line with their current
+    values, so a save costs O(changes since the last save) and is cheap enough to
+    run every simulated minute. Every `compact_after` entries, or after the
+    inventory is replaced, the full state is written to a new snapshot instead
+    and the journal starts over.
+
+    Each snapshot carries a random generation tag that the journal repeats in its
+    first line. Entries from an older generation are never replayed over a newer
+    snapshot, so a crash between writing the snapshot and truncating the journal
+    is harmless. A torn last line is ignored.
+
+    Attributes:
+        - shop (Shop): The shop being saved.
+        - engine (SimulationEngine): Clock and popularity to save alongside the shop (optional).
+        - path (str): Path prefix of the snapshot and journal files.
+        - compact_after (int): Journal entries written before the next save takes a snapshot.
+        - entries (int): Journal entries written since the last snapshot.
+    """
+    def __init__(self, shop, engine=None, path=SAVE_PATH, compact_after=1000):
+        """
+        Initialize a SaveJournal and start tracking the shop's changes.
+
+        Parameters:
+            - shop (Shop): The shop to save.
+            - engine (SimulationEngine): Clock and popularity to save alongside the shop (optional).
+            - path (str): Path prefix of the snapshot and journal files.
+            - compact_after (int): Journal entries written before the next save takes a snapshot.
+        """
+        self.shop = shop
+        self.engine = engine
+        self.path = path
+        self.compact_after = compact_after
+        self.entries = 0
+        self.generation = None
+        self._journal_file = None
+        self._dirty_products = set()
+        self._cash_dirty = False
+        self._needs_snapshot = True
+        self._saved_status = None
+        shop.subscribe(STOCK_CHANGED, self._dirty_products.update)
+        shop.subscribe(CASH_CHANGED, self._mark_cash_dirty)
+        shop.subscribe(INVENTORY_RESET, self._mark_needs_snapshot)
+
+    @property
+    def snapshot_path(self):
+        return self.path + SNAPSHOT_SUFFIX
+
+    @property
+    def journal_path(self):
+        return self.path + JOURNAL_SUFFIX
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path)
+
+    def saved_at(self):
+        """
+        Return when the save was last written, as a time.time() timestamp, or None if there is no save.
+        """
+        times = []
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                times.append(os.path.getmtime(path))
+            except OSError:
+                pass
+        return max(times) if times else None
+
+    def _mark_cash_dirty(self, cash_mills):
+        self._cash_dirty = True
+
+    def _mark_needs_snapshot(self):
+        self._needs_snapshot = True
+
+    def _status(self):
+        """
+        State saved with every entry whenever it changed: shop condition, clock and popularity.
+        """
+        status = {'cleanliness': self.shop.cleanliness, 'customer_service': self.shop.customer_service}
+        if self.engine is not None:
+            status.update(day=self.engine.day, minute=self.engine.minute,
+                          store_open=self.engine.store_open, popularity=self.engine.popularity)
+        return status
+
+    def _clear_changes(self):
+        self._dirty_products.clear()
+        self._cash_dirty = False
+        self._needs_snapshot = False
+
+    def save(self):
+        """
+        Persist the changes since the last save, taking a snapshot when one is due.
+
+        Returns:
+            bool: True if anything was written, False if nothing had changed.
+        """
+        if self._needs_snapshot or self.entries >= self.compact_after:
+            self.snapshot()
+            return True
+
+        entry = {}
+        if self._dirty_products:
+            inventory = self.shop.inventory
+            entry['stock'] = {product_number: inventory.stock_milli[inventory.index[product_number]]
+                              for product_number in self._dirty_products if product_number in inventory.index}
+        if self._cash_dirty:
+            entry['cash'] = self.shop.cash_mills
+        status = self._status()
+        if status != self._saved_status:
+            entry['status'] = self._saved_status = status
+        self._clear_changes()
+        if not entry:
+            return False
+
+        self._journal_file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+        self._journal_file.flush()
+        self.entries += 1
+        return True
+
+    def snapshot(self):
+        """
+        Write the full state to a new snapshot and start an empty journal for it.
+        """
+        inventory = self.shop.inventory
+        self.generation = uuid.uuid4().hex
+        self._saved_status = self._status()
+        state = {
+            'generation': self.generation,
+            'cash': self.shop.cash_mills,
+            'status': self._saved_status,
+            'inventory': {
+                'product_numbers': inventory.product_numbers,
+                'names': inventory.names,
+                'vendor_units': inventory.vendor_units,
+                'unit_price_mills': inventory.unit_price_mills.tolist(),
+                'price_per_unit_micros': inventory.price_per_unit_micros.tolist(),
+                'stock_milli': inventory.stock_milli.tolist(),
+            },
+        }
+        temp_path = self.snapshot_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(temp_path, self.snapshot_path)
+
+        self._open_journal('w')
+        self.entries = 0
+        self._clear_changes()
+        if trace.enabled:
+            trace.info("Saved snapshot %s of %d items", self.generation, len(inventory))
+
+    def _open_journal(self, mode):
+        if self._journal_file is not None:
+            self._journal_file.close()
+        self._journal_file = open(self.journal_path, mode)
+        if mode == 'w':
+            self._journal_file.write(json.dumps({'generation': self.generation}) + "\n")
+            self._journal_file.flush()
+
+    def _read_journal(self):
+        """
+        Read the journal entries written against the current snapshot.
+
+        Returns:
+            tuple: The entries, and whether the journal can be appended to as is.
+        """
+        try:
+            with open(self.journal_path, 'r') as f:
+                lines = f.readlines()
+        except OSError:
+            return [], False
+        entries = []
+        for index, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                if trace.enabled:
+                    trace.warning("Ignoring torn journal line %d", index + 1)
+                return entries, False
+            if index == 0:
+                if entry.get('generation') != self.generation:
+                    return [], False
+                continue
+            entries.append(entry)
+        return entries, bool(lines)
+
+    def load(self):
+        """
+        Restore the shop (and engine) from the snapshot and replay the journal over it.
+
+        Returns:
+            bool: True if a save was loaded, False if there is none.
+        """
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        self.generation = state['generation']
+        inventory = InventoryTable.from_columns(state['inventory'])
+        cash_mills = state['cash']
+        status = state['status']
+
+        entries, clean = self._read_journal()
+        for entry in entries:
+            for product_number, stock_milli in entry.get('stock', {}).items():
+                row = inventory.index.get(product_number)
+                if row is not None:
+                    inventory.stock_milli[row] = stock_milli
+            cash_mills = entry.get('cash', cash_mills)
+            status = entry.get('status', status)
+
+        self._apply_status(status)
+        self.shop.cash_mills = cash_mills
+        self.shop.reset_inventory(inventory)
+        self.shop.publish(CASH_CHANGED, cash_mills)
+
+        self._saved_status = status
+        self._clear_changes()
+        if clean:
+            self._open_journal('a')
+            self.entries = len(entries)
+        else:
+            self.snapshot()  # Start a fresh journal rather than append after a stale or torn one
+        if trace.enabled:
+            trace.info("Loaded snapshot %s and replayed %d entries", self.generation, self.entries)
+        return True
+
+    def _apply_status(self, status):
+        self.shop.cleanliness = status['cleanliness']
+        self.shop.customer_service = status['customer_service']
+        if self.engine is not None and 'day' in status:
+            self.engine.restore(status['day'], status['minute'], status['store_open'], status['popularity'])
+
+    def close(self):
+        """
+        Close the journal file, if one is open.
+        """
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
@@ -0,0 +1,104 @@
+import os
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING}
+
+BUFFER_SIZE = 10000
+
+
+class TraceChannel:
+    """
+    A named trace channel.
+
+    Call sites guard every trace with the channel's `enabled` flag, so a disabled
+    channel costs one attribute check and never formats its message:
+
+        if trace.enabled:
+            trace.debug("Item index: %s", item_index)
+
+    Enabled channels store the raw message and arguments in the shared ring
+    buffer; formatting happens only when the buffer is dumped.
+    """
+    def __init__(self, name, buffer):
+        self.name = name
+        self.level = WARNING
+        self.enabled = False
+        self._buffer = buffer
+
+    def enable(self, level=DEBUG):
+        self.level = level
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def log(self, level, message, *args):
+        if self.enabled and level >= self.level:
+            # deque.append is atomic and never blocks; the oldest records fall off the end
+            self._buffer.append((time.time(), self.name, level, message, args))
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, *args)
+
+
+_buffer = deque(maxlen=BUFFER_SIZE)
+_channels = {}
+
+
+def get_channel(name):
+    """
+    Return the channel called `name`, creating it (disabled) on first use.
+    """
+    channel = _channels.get(name)
+    if channel is None:
+        channel = _channels[name] = TraceChannel(name, _buffer)
+    return channel
+
+
+def configure(spec):
+    """
+    Enable channels from a spec such as "ui:debug,data:info"; a bare name enables debug level.
+    """
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = entry.partition(':')
+        get_channel(name).enable(LEVELS.get(level.lower(), DEBUG))
+
+
+def format_record(record):
+    timestamp, name, level, message, args = record
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = " ".join([message] + [repr(arg) for arg in args])
+    level_name = next((key for key, value in LEVELS.items() if value == level), str(level))
+    return f"{timestamp:.6f} {name} {level_name.upper()} {message}"
+
+
+def dump(stream=None, clear=True):
+    """
+    Format the buffered records, oldest first, and write them to `stream` if one is given.
+
+    Returns:
+        list: The formatted lines.
+    """
+    records = list(_buffer)
+    if clear:
+        _buffer.clear()
+    lines = [format_record(record) for record in records]
+    if stream is not None:
+        stream.write("".join(line + "\n" for line in lines))
+    return lines
+
+
+configure(os.getenv('SHOP_TRACE', ''))
@@ -3,5 +3,9 @@ from .scrollable_text import ScrollableText
 from .info_box import InfoBox
 from .dropdown_menu import DropdownMenu
 from .popup import Popup
-from .ui_helpers import initialize_ui_elements, handle_events, draw_ui_elements, display_message
+from .ui_helpers import initialize_ui_elements, handle_events, update_game_state, draw_ui_elements, ui_widgets, display_message
+from .renderer import DirtyRectRenderer, DirtyWidget
+from .profiler_overlay import ProfilerOverlay
 
+from .hit_grid import HitGrid
+from .event_dispatcher import EventDispatcher
@@ -1,7 +1,10 @@
 import pygame
 from helpers import render_text
+from .renderer import DirtyWidget
+
+class Button(DirtyWidget):
+    event_types = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
 
-class Button:
     def __init__(self, text, x, y, width, height, action=None, font=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = (70, 130, 180)  # Steel blue
@@ -12,13 +15,19 @@ class Button:
         self.font = font
         self.clicked = False
 
-    def draw(self, screen):
+    def current_color(self):
         color = self.color
         if self.rect.collidepoint(pygame.mouse.get_pos()):
             color = self.hover_color
             if pygame.mouse.get_pressed()[0]:
                 color = self.click_color
+        return color
 
+    def visual_state(self):
+        return self.text, self.current_color()
+
+    def draw(self, screen):
+        color = self.current_color()
         pygame.draw.rect(screen, color, self.rect, border_radius=5)
         text_surf = render_text(self.font, self.text, (255, 255, 255))
         text_rect = text_surf.get_rect(center=self.rect.center)
@@ -1,9 +1,14 @@
 import pygame
-from icecream import ic
 from constants import BLACK, GRAY, BUTTON_COLOR, BUTTON_HOVER_COLOR, BUTTON_CLICK_COLOR, BUTTON_EXPANDED_COLOR
 from helpers import render_text, center_text_in_rect
+from tracing import get_channel
+from .renderer import DirtyWidget
+
+trace = get_channel('ui')
+
+class DropdownMenu(DirtyWidget):
+    event_types = (pygame.MOUSEBUTTONDOWN,)
 
-class DropdownMenu:
     def __init__(self, x, y, width, options, actions, font):
         self.rect = pygame.Rect(x, y, width, 40)
         self.options = options
@@ -11,21 +16,50 @@ class DropdownMenu:
         self.font = font
         self.expanded = False
         self.option_height = 40
+        self.layout()
+
+    def layout(self):
+        # Option rects are rebuilt only when the menu moves, not per event or per frame
+        self.option_rects = [pygame.Rect(self.rect.x, self.rect.y + (i + 1) * self.option_height, self.rect.width, self.option_height)
+                             for i in range(len(self.options))]
+        self.expanded_rect = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, self.option_height * (len(self.options) + 1))
+
+    def move(self, x, y):
+        self.rect.topleft = (x, y)
+        self.layout()
+
+    def option_at(self, pos):
+        if not self.expanded or not self.expanded_rect.collidepoint(pos):
+            return None
+        i = (pos[1] - self.rect.y) // self.option_height - 1
+        return i if 0 <= i < len(self.options) else None
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.rect.collidepoint(event.pos):
                 self.expanded = not self.expanded
-                ic(self.expanded)
+                if trace.enabled:
+                    trace.debug("Dropdown expanded: %s", self.expanded)
             elif self.expanded:
-                for i, option in enumerate(self.options):
-                    option_rect = pygame.Rect(self.rect.x, self.rect.y + (i + 1) * self.option_height, self.rect.width, self.option_height)
-                    if option_rect.collidepoint(event.pos):
-                        self.actions[i]()
-                        self.expanded = False
-                        ic(option, self.actions[i])
-                        return
+                i = self.option_at(event.pos)
                 self.expanded = False
+                if i is not None:
+                    self.actions[i]()
+                    if trace.enabled:
+                        trace.debug("Dropdown option %s -> %r", self.options[i], self.actions[i])
+
+    def click_outside(self, event):
+        self.expanded = False
+
+    def bounds(self):
+        return self.expanded_rect if self.expanded else self.rect
+
+    def visual_state(self):
+        mouse_pos = pygame.mouse.get_pos()
+        hovered = None
+        if self.bounds().collidepoint(mouse_pos):
+            hovered = (mouse_pos[1] - self.rect.y) // self.option_height
+        return self.expanded, hovered, pygame.mouse.get_pressed()[0] if hovered is not None else False
 
     def draw(self, screen):
         color = BUTTON_EXPANDED_COLOR if self.expanded else BUTTON_COLOR
@@ -47,8 +81,7 @@ class DropdownMenu:
         screen.blit(arrow_surf, arrow_rect)
 
         if self.expanded:
-            for i, option in enumerate(self.options):
-                option_rect = pygame.Rect(self.rect.x, self.rect.y + (i + 1) * self.option_height, self.rect.width, self.option_height)
+            for option, option_rect in zip(self.options, self.option_rects):
                 color = BUTTON_COLOR
                 if option_rect.collidepoint(pygame.mouse.get_pos()):
                     color = BUTTON_HOVER_COLOR
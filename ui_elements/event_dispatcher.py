@@ -0,0 +1,66 @@
+import pygame
+
+
+class EventDispatcher:
+    """
+    Routing table from pygame event type to the handlers subscribed to it.
+
+    Events of a type nobody subscribed to are dropped without calling anything.
+    Runs of consecutive MOUSEMOTION events are coalesced into one event per
+    run, so a fast mouse costs one handler call per frame instead of one per
+    motion sample. A handler returning False stops the dispatch.
+    """
+    def __init__(self):
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self.handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self.handlers[event_type]
+
+    def subscribed(self, event_type):
+        return event_type in self.handlers
+
+    def coalesce(self, events):
+        """
+        Drop the events nobody handles and merge each run of motion events into its last one.
+        """
+        handlers = self.handlers
+        if pygame.MOUSEMOTION not in handlers:
+            return [event for event in events if event.type in handlers]
+        coalesced = []
+        motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                if motion is not None:
+                    # The last position wins; the relative movement covers the whole run
+                    rel = (motion.rel[0] + event.rel[0], motion.rel[1] + event.rel[1])
+                    event = pygame.event.Event(pygame.MOUSEMOTION, dict(event.dict, rel=rel))
+                motion = event
+                continue
+            if motion is not None:
+                coalesced.append(motion)
+                motion = None
+            if event.type in handlers:
+                coalesced.append(event)
+        if motion is not None:
+            coalesced.append(motion)
+        return coalesced
+
+    def dispatch(self, events):
+        """
+        Deliver a frame's events to their handlers in order.
+
+        Returns:
+            bool: False if a handler stopped the dispatch, True otherwise.
+        """
+        for event in self.coalesce(events):
+            for handler in self.handlers.get(event.type, ()):
+                if handler(event) is False:
+                    return False
+        return True
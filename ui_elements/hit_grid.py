@@ -0,0 +1,88 @@
+import pygame
+
+
+class HitGrid:
+    """
+    Uniform grid over widget rectangles, answering "which widget is under this point" without scanning every widget.
+
+    Each target is filed under every grid cell its rectangle touches. A lookup
+    checks only the targets of one cell and returns the topmost by z-order;
+    moving a target rehashes just that target.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}  # target -> (rect, z, cells)
+        self.synced = set()
+        self.order = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, target):
+        return target in self.entries
+
+    def _cells(self, rect):
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(rect.left // size, (rect.right - 1) // size + 1)
+                for cy in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def add(self, target, rect, z=0):
+        """
+        File `target` under `rect`, or move it there if it is already filed.
+        """
+        rect = pygame.Rect(rect)
+        entry = self.entries.get(target)
+        if entry is not None:
+            if entry[0] == rect:
+                if entry[1] != z:
+                    self.entries[target] = (entry[0], z, entry[2])
+                return
+            self.remove(target)
+        cells = self._cells(rect) if rect.width > 0 and rect.height > 0 else []
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(target)
+        self.entries[target] = (rect, z, cells)
+
+    update = add
+
+    def remove(self, target):
+        entry = self.entries.pop(target, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            targets = self.cells[cell]
+            targets.remove(target)
+            if not targets:
+                del self.cells[cell]
+
+    def sync(self, targets):
+        """
+        Make the widgets filed by sync() exactly `targets`, stacked in list order (later on top), at their
+        current bounds(). Targets filed directly with add() are left alone.
+        """
+        synced = set(targets)
+        for target in self.synced - synced:
+            self.remove(target)
+        self.synced = synced
+        self.order = list(targets)
+        for z, target in enumerate(targets):
+            self.add(target, target.bounds(), z)
+
+    def refresh(self):
+        # Re-read the bounds of the synced widgets, e.g. after a click opened or moved one
+        self.sync(self.order)
+
+    def hit(self, pos):
+        """
+        Return the topmost target whose rectangle contains `pos`, or None.
+        """
+        size = self.cell_size
+        best = None
+        best_z = None
+        for target in self.cells.get((pos[0] // size, pos[1] // size), ()):
+            rect, z, _ = self.entries[target]
+            if (best_z is None or z > best_z) and rect.collidepoint(pos):
+                best, best_z = target, z
+        return best
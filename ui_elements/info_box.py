@@ -1,15 +1,18 @@
 import pygame
-from icecream import ic
 from constants import BLACK, GRAY
 from helpers import render_text, center_text_in_rect
+from .renderer import DirtyWidget
 
-class InfoBox:
+class InfoBox(DirtyWidget):
     def __init__(self, x, y, width, height, font, text=''):
         self.rect = pygame.Rect(x, y, width, height)
         self.font = font
         self.text = text
         self.txt_surface = render_text(self.font, text, BLACK)
 
+    def visual_state(self):
+        return self.text
+
     def draw(self, screen):
         pygame.draw.rect(screen, GRAY, self.rect, 2)
         pygame.draw.rect(screen, BLACK, self.rect, 2)
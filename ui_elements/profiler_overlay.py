@@ -0,0 +1,30 @@
+import pygame
+from constants import WHITE
+from helpers import render_text
+from utils import overlay_surface
+from .renderer import DirtyWidget
+
+class ProfilerOverlay(DirtyWidget):
+    def __init__(self, x, y, width, font, profiler, refresh_frames=30):
+        self.font = font
+        self.profiler = profiler
+        self.refresh_frames = refresh_frames  # Percentiles are recomputed every few frames, not every frame
+        self.line_height = font.get_linesize()
+        self.rect = pygame.Rect(x, y, width, self.line_height * 8 + 10)
+        self.lines = []
+        self.refreshed_at = None
+
+    def visual_state(self):
+        frame = self.profiler.frames // self.refresh_frames
+        if frame != self.refreshed_at:
+            self.refreshed_at = frame
+            self.lines = self.profiler.format_lines()
+            self.rect.height = self.line_height * len(self.lines) + 10
+        return tuple(self.lines)
+
+    def draw(self, screen):
+        screen.blit(overlay_surface(self.rect.size, (0, 0, 0, 180)), self.rect.topleft)
+        y = self.rect.y + 5
+        for line in self.lines:
+            screen.blit(render_text(self.font, line, WHITE), (self.rect.x + 8, y))
+            y += self.line_height
@@ -0,0 +1,130 @@
+import pygame
+from profiler import DRAW, FLIP
+
+
+class DirtyWidget:
+    """
+    Mixin for widgets drawn by DirtyRectRenderer.
+
+    A widget describes everything that affects its appearance in visual_state();
+    it is redrawn only when that state or its bounds change since the last draw.
+    Widgets whose content changes override visual_state(); the default suits static ones.
+    """
+    _drawn_state = None
+    _drawn_bounds = None
+    _pending_state = None
+
+    def visual_state(self):
+        # Never None, so mark_dirty() still forces a redraw
+        return tuple(self.rect)
+
+    def bounds(self):
+        return self.rect
+
+    def mark_dirty(self):
+        self._drawn_state = None
+
+    def dirty_rects(self):
+        state = self.visual_state()
+        bounds = self.bounds()
+        self._pending_state = state
+        if state == self._drawn_state and bounds == self._drawn_bounds:
+            return []
+        if self._drawn_bounds is None:
+            return [pygame.Rect(bounds)]
+        return [self._drawn_bounds.union(bounds)]
+
+    def mark_drawn(self):
+        self._drawn_state = self._pending_state
+        self._drawn_bounds = pygame.Rect(self.bounds())
+
+
+class DirtyRectRenderer:
+    """
+    Redraws only the screen regions whose widgets changed, then pushes just those regions to the display.
+
+    Widgets are drawn in list order, so later widgets sit on top. When nothing
+    is dirty the frame is skipped and tick() drops to the idle frame rate.
+    """
+    def __init__(self, screen, background, fps=60, idle_fps=10, profiler=None):
+        self.screen = screen
+        self.profiler = profiler  # Times drawing and the display update when set
+        self.background = background
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.clock = pygame.time.Clock()
+        self.widgets = []
+        self.full_redraw = True
+        self.extra_dirty = []
+
+    def invalidate(self, rect=None):
+        """
+        Force a redraw of `rect`, or of the whole screen when no rect is given.
+        """
+        if rect is None:
+            self.full_redraw = True
+        else:
+            self.extra_dirty.append(pygame.Rect(rect))
+
+    def render(self, widgets):
+        """
+        Draw the dirty parts of `widgets` and update the display.
+
+        Returns:
+            bool: True if anything was drawn, False if the frame was skipped.
+        """
+        previous, self.widgets = self.widgets, list(widgets)
+        dirty = self.extra_dirty
+        self.extra_dirty = []
+        for widget in previous:
+            if widget not in self.widgets and widget._drawn_bounds is not None:
+                dirty.append(widget._drawn_bounds)  # Restore the area a removed widget covered
+                widget._drawn_state = widget._drawn_bounds = None
+        for widget in self.widgets:
+            dirty.extend(widget.dirty_rects())
+
+        profiler = self.profiler
+        if self.full_redraw:
+            self.full_redraw = False
+            start = profiler.now() if profiler else 0
+            self.screen.blit(self.background, (0, 0))
+            for widget in self.widgets:
+                widget.draw(self.screen)
+                widget.mark_drawn()
+            if profiler:
+                profiler.add(DRAW, start)
+                start = profiler.now()
+            pygame.display.flip()
+            if profiler:
+                profiler.add(FLIP, start)
+            return True
+
+        if not dirty:
+            return False
+
+        start = profiler.now() if profiler else 0
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.screen.blit(self.background, rect, rect)
+            for widget in self.widgets:
+                if widget.bounds().colliderect(rect):
+                    widget.draw(self.screen)
+        self.screen.set_clip(None)
+        for widget in self.widgets:
+            widget.mark_drawn()
+        if profiler:
+            profiler.add(DRAW, start)
+            start = profiler.now()
+        pygame.display.update(dirty)
+        if profiler:
+            profiler.add(FLIP, start)
+        return True
+
+    def tick(self, busy=True):
+        """
+        Wait out the rest of the frame, at the idle frame rate when not busy.
+
+        Returns:
+            int: Milliseconds since the previous tick.
+        """
+        return self.clock.tick(self.fps if busy else self.idle_fps)
@@ -1,80 +1,123 @@
 import pygame
 from constants import BLACK
-from helpers import render_text, handle_mouse_click
-from icecream import ic
+from helpers import TextCache, handle_mouse_click
+from utils import overlay_surface
 from ui_elements.popup import Popup
+from tracing import get_channel
+from .renderer import DirtyWidget
 
-class ScrollableText:
-    def __init__(self, x, y, width, height, font, text_font, game_state):
+trace = get_channel('ui')
+
+class ScrollableText(DirtyWidget):
+    event_types = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+    def __init__(self, x, y, width, height, font, text_font, game_state, cache_size=256, max_lines=None, clickable=False):
         self.rect = pygame.Rect(x, y, width, height)
         self.font = font
         self.text_font = text_font
         self.texts = []
-        self.rendered_texts = []
+        self.version = 0
+        self.line_cache = TextCache(cache_size)  # Own cache, so a long log cannot evict the shared labels
+        self.max_lines = max_lines
         self.scroll_offset = 0
         self.color = BLACK
         self.game_state = game_state
         self.scroll_active = False
+        self.clickable = clickable  # Whether clicking a row opens a popup for it
+        self.pressed_row = None
 
     def add_text(self, text):
         if text is None:
             text = "No message provided."
         self.texts.extend(text.split('\n'))
+        if self.max_lines is not None and len(self.texts) > self.max_lines:
+            del self.texts[:len(self.texts) - self.max_lines]
         self.scroll_offset = 0
-        self.cache_rendered_texts()
+        self.version += 1
 
-    def cache_rendered_texts(self):
-        self.rendered_texts = [render_text(self.text_font, text, self.color) for text in self.texts]
+    def set_text(self, text):
+        self.texts = text.split('\n') if text else []
+        self.scroll_offset = 0
+        self.version += 1
 
-    def draw(self, screen):
-        clear_surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-        clear_surface.fill((255, 255, 255, 0))
-        screen.blit(clear_surface, self.rect.topleft)
+    def set_line(self, index, text):
+        self.texts[index] = text
+        if self.scroll_offset <= index < self.scroll_offset + self.max_visible_lines():
+            self.version += 1  # Rows outside the viewport need no redraw
+
+    def update_text(self, text):
+        # Keep the unchanged leading lines and replace only the tail that differs
+        new_texts = text.split('\n') if text else []
+        common = 0
+        for old_line, new_line in zip(self.texts, new_texts):
+            if old_line != new_line:
+                break
+            common += 1
+        if common == len(self.texts) == len(new_texts):
+            return
+        self.texts[common:] = new_texts[common:]
+        self.version += 1
+        self.scroll_offset = min(self.scroll_offset, max(0, len(self.texts) - self.max_visible_lines()))
 
-        overlay = pygame.Surface(self.rect.size, pygame.SRCALPHA)
-        overlay.fill((255, 255, 255, 128))
+    def max_visible_lines(self):
+        return (self.rect.height - 20) // (self.text_font.get_height() + 5)
 
-        screen.blit(overlay, self.rect.topleft)
+    def rendered_line(self, text):
+        # Lines are rendered only when they scroll into view
+        return self.line_cache.render(self.text_font, text, self.color)
+
+    def visual_state(self):
+        return self.version, self.scroll_offset
+
+    def draw(self, screen):
+        screen.blit(overlay_surface(self.rect.size, (255, 255, 255, 128)), self.rect.topleft)
         pygame.draw.rect(screen, BLACK, self.rect, 2)
 
         y = 10
-        max_visible_lines = (self.rect.height - 20) // (self.text_font.get_height() + 5)
-        visible_texts = self.rendered_texts[self.scroll_offset:self.scroll_offset + max_visible_lines]
+        visible_texts = self.texts[self.scroll_offset:self.scroll_offset + self.max_visible_lines()]
 
-        for text_surf in visible_texts:
+        for text in visible_texts:
+            text_surf = self.rendered_line(text)
             screen.blit(text_surf, (self.rect.x + 10, self.rect.y + y))
             y += text_surf.get_height() + 5
 
+    def scroll(self, lines):
+        self.scroll_offset = max(0, min(self.scroll_offset + lines, len(self.texts) - self.max_visible_lines()))
+        if trace.enabled:
+            trace.debug("Scroll offset: %d", self.scroll_offset)
+
+    def row_at(self, pos):
+        # Rows are found by arithmetic, not by testing a rect per row
+        if not self.rect.collidepoint(pos):
+            return None
+        item_height = self.text_font.get_height() + 5
+        relative_y = pos[1] - self.rect.y - 10  # draw() starts the first row 10 pixels down
+        item_index = self.scroll_offset + relative_y // item_height
+        if trace.enabled:
+            trace.debug("Item index: %d, scroll_offset: %d, relative_y: %d", item_index, self.scroll_offset, relative_y)
+        if relative_y >= 0 and item_index < len(self.texts):
+            return item_index
+        return None
+
     def handle_event(self, event):
-        ic(event)
-        if self.game_state.popup is None:
+        if self.game_state.popup is not None:
+            return
+        if event.type == pygame.MOUSEBUTTONDOWN:
             if handle_mouse_click(self.rect, event):
-                ic("Click is within rect")
                 self.scroll_active = True
-            if event.type == pygame.MOUSEBUTTONUP:
-                self.scroll_active = False
-                if handle_mouse_click(self.rect, event):
-                    item_height = self.text_font.get_height() + 5
-                    relative_y = event.pos[1] - self.rect.y
-                    item_index = self.scroll_offset + relative_y // item_height
-                    ic("Click detected within scrollable area")
-                    ic(f"Item index: {item_index}, scroll_offset: {self.scroll_offset}, relative_y: {relative_y}")
-                    if 0 <= item_index < len(self.texts):
-                        ic("Creating Popup for item:", self.texts[item_index])
-                        self.game_state.popup = Popup(self.texts[item_index], self.game_state)
-                        ic(f"Clicked on item: {self.texts[item_index]}")
-                        ic(f"Popup created with item text: {self.texts[item_index]}")
-            if self.scroll_active and hasattr(event, 'button'):
                 if event.button == 4:
-                    self.scroll_offset = max(0, self.scroll_offset - 1)
-                    ic(f"Scrolled up, new scroll_offset: {self.scroll_offset}")
-                if event.button == 5:
-                    max_visible_lines = (self.rect.height - 20) // (self.text_font.get_height() + 5)
-                    self.scroll_offset = min(len(self.texts) - max_visible_lines, self.scroll_offset + 1)
-                    ic(f"Scrolled down, new scroll_offset: {self.scroll_offset}")
-
-            max_visible_lines = (self.rect.height - 20) // (self.text_font.get_height() + 5)
-            self.scroll_offset = max(0, min(self.scroll_offset, len(self.texts) - max_visible_lines))
-            ic(f"Final scroll_offset: {self.scroll_offset}")
-        elif self.game_state.popup:
-            self.game_state.popup.handle_event(event)
+                    self.scroll(-1)
+                elif event.button == 5:
+                    self.scroll(1)
+            if event.button == 1 and self.clickable:
+                self.pressed_row = self.row_at(event.pos)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.scroll_active = False
+            if event.button != 1:
+                return  # The wheel sends a release of its own for every notch
+            pressed_row, self.pressed_row = self.pressed_row, None
+            # A press on one row released on another, or dragged out of the box, selects nothing
+            if pressed_row is not None and self.row_at(event.pos) == pressed_row:
+                self.game_state.popup = Popup(self.texts[pressed_row], self.game_state)
+                if trace.enabled:
+                    trace.debug("Popup created with item text: %s", self.texts[pressed_row])
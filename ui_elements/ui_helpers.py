@@ -1,15 +1,26 @@
 import pygame
 
 from constants import RED, WHITE
-from game_logic import begin_day
+from customers import REVIEW_ADDED, format_review
+from engine import ACCELERATED, format_minute
+from game_logic import CASH_CHANGED, INVENTORY_RESET, STOCK_CHANGED
 from .buttons import Button
 from .scrollable_text import ScrollableText
 from .info_box import InfoBox
 from .dropdown_menu import DropdownMenu
 from .popup import Popup
+from .profiler_overlay import ProfilerOverlay
+from .hit_grid import HitGrid
+from .event_dispatcher import EventDispatcher
 from utils import draw_rounded_rect
-from helpers import render_text, center_text_in_rect, handle_mouse_click
-from icecream import ic
+from helpers import render_text, center_text_in_rect, handle_mouse_click, load_font
+from tracing import get_channel, dump
+from profiler import PROFILE_EXPORT_FILE, SIMULATION, UI_SYNC
+
+trace = get_channel('events')
+TRACE_DUMP_FILE = 'trace.log'
+MAX_CLOCK_SPEED = 64
+WIDGET_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)  # Mouse events routed to the widget under the cursor
 
 def initialize_ui_elements(screen_width, screen_height, font, game_state, exit_to_menu, start_day):
     left_x = 10
@@ -18,10 +29,15 @@ def initialize_ui_elements(screen_width, screen_height, font, game_state, exit_t
     box_height = 40
     spacing = 10
 
+    def save_game():
+        game_state.journal.save()  # Shop deltas, written in place
+        game_state.autosave.request()  # Full state, written by the autosave thread
+        game_state.save_customers()
+
     game_state.dropdown_menu = DropdownMenu(
         left_x, left_y, box_width, 
         ["Save", "Exit"], 
-        [lambda: game_state.shop.save_game(), exit_to_menu], 
+        [save_game, exit_to_menu], 
         font
     )
 
@@ -33,59 +49,181 @@ def initialize_ui_elements(screen_width, screen_height, font, game_state, exit_t
     content_height = screen_height - content_y - 50 - 20
     half_width = (screen_width - 40) // 2
 
-    small_font = pygame.font.Font('Montserrat-Regular.ttf', 24)
+    small_font = load_font('Montserrat-Regular.ttf', 24)
 
-    game_state.scrollable_text = ScrollableText(left_x, content_y, half_width - 10, content_height, font, small_font, game_state)
-    game_state.inventory_display = ScrollableText(left_x + half_width + 20, content_y, half_width - 10, content_height, font, small_font, game_state)
-    game_state.inventory_display.add_text(game_state.shop.show_inventory())
+    game_state.scrollable_text = ScrollableText(left_x, content_y, half_width - 10, content_height, font, small_font, game_state,
+                                                max_lines=game_state.customer_manager.reviews.capacity)
+    game_state.inventory_display = ScrollableText(left_x + half_width + 20, content_y, half_width - 10, content_height, font, small_font, game_state,
+                                                  clickable=True)
+    game_state.hit_grid = HitGrid()
+    game_state.pointer_capture = None
+    game_state.profiler_overlay = ProfilerOverlay(screen_width - 420, content_y, 410, small_font, game_state.profiler)
+    bind_change_events(game_state)
+    bind_input_events(game_state)
     # ic(game_state.__dict__)  # Debugging
 
+def bind_change_events(game_state):
+    # Drop the subscriptions made for the widgets of a previous initialization
+    for observable, topic, callback in game_state.subscriptions:
+        observable.unsubscribe(topic, callback)
+    game_state.subscriptions = []
+
+    shop = game_state.shop
+    inventory_display = game_state.inventory_display
+    inventory_rows = {}
+
+    def refresh_inventory():
+        inventory_rows.clear()
+        inventory_rows.update((product_number, row) for row, product_number in enumerate(shop.inventory))
+        inventory_display.set_text(shop.show_inventory())
+
+    def update_inventory_rows(product_numbers):
+        for product_number in product_numbers:
+            row = inventory_rows.get(product_number)
+            if row is not None:
+                inventory_display.set_line(row, str(shop.inventory[product_number]))
+
+    def append_reviews(reviews):
+        game_state.scrollable_text.add_text("\n".join(format_review(review) for review in reviews))
+
+    subscriptions = [
+        (shop, INVENTORY_RESET, refresh_inventory),
+        (shop, STOCK_CHANGED, update_inventory_rows),
+        (game_state.customer_manager, REVIEW_ADDED, append_reviews),
+    ]
+    profiler = game_state.profiler
+    subscriptions = [(observable, topic, profiler.wrap(UI_SYNC, callback)) for observable, topic, callback in subscriptions]
+    for observable, topic, callback in subscriptions:
+        observable.subscribe(topic, callback)
+    game_state.subscriptions = subscriptions
+    refresh_inventory()
+
+def event_targets(buttons, game_state):
+    # The menu buttons when given, otherwise the interactive game widgets, bottom to top
+    if buttons:
+        return buttons
+    return [widget for widget in ui_widgets(game_state) if hasattr(widget, 'handle_event')]
+
+def bind_input_events(game_state):
+    # Only these event types reach any handler; mouse motion and everything else is dropped unhandled
+    dispatcher = game_state.event_dispatcher = EventDispatcher()
+
+    def quit_game(event):
+        game_state.quit_game = True
+        return False  # Stop dispatching the rest of the frame's events
+
+    dispatcher.subscribe(pygame.QUIT, quit_game)
+    dispatcher.subscribe(pygame.KEYDOWN, lambda event: handle_key(event.key, game_state))
+    for event_type in WIDGET_EVENTS:
+        dispatcher.subscribe(event_type, lambda event: route_mouse_event(event, game_state))
+
+def deliver(widget, event):
+    # Widgets list the event types they handle; anything else never reaches them
+    if widget is not None and event.type in widget.event_types:
+        widget.handle_event(event)
+
+def route_mouse_event(event, game_state):
+    popup = game_state.popup
+    if popup or isinstance(game_state.pointer_capture, Popup):
+        # The popup is modal: it captures every press made while it is open, and the release that
+        # ends the press is swallowed even when Buy or Exit closed the popup in between
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            game_state.pointer_capture = popup
+        elif event.type == pygame.MOUSEBUTTONUP:
+            game_state.pointer_capture = None
+        deliver(popup, event)
+        return
+    hit_grid = game_state.hit_grid
+    target = hit_grid.hit(event.pos)
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if trace.enabled:
+            trace.debug("Mouse click at %s", event.pos)
+        for widget in hit_grid.synced:
+            if widget is not target and hasattr(widget, 'click_outside'):
+                widget.click_outside(event)
+        game_state.pointer_capture = target
+    deliver(target, event)
+    if event.type == pygame.MOUSEBUTTONUP:
+        # The widget that saw the press also sees the release, wherever it happens
+        captured = game_state.pointer_capture
+        game_state.pointer_capture = None
+        if captured is not target:
+            deliver(captured, event)
+    elif event.type == pygame.MOUSEBUTTONDOWN:
+        hit_grid.refresh()  # A click can open or move widgets
+
+def handle_key(key, game_state):
+    if key == pygame.K_F12:
+        with open(TRACE_DUMP_FILE, 'a') as f:
+            dump(f)  # Dump the trace ring buffer on demand
+    elif key == pygame.K_F3:
+        game_state.show_profiler = not game_state.show_profiler
+    elif key == pygame.K_F4:
+        game_state.profiler.export(PROFILE_EXPORT_FILE)
+    elif not game_state.popup:
+        handle_clock_key(key, game_state.engine)
+
 def handle_events(buttons, events, game_state):
-    running = True
-    for event in events:
-        if event.type == pygame.QUIT:
-            game_state.quit_game = True
-            running = False
-            break
-        for button in buttons:
-            button.handle_event(event)
-            # ic(event)  # Debugging
-        if not running:
-            break
-        game_state.scrollable_text.handle_event(event)
-        game_state.inventory_display.handle_event(event)
-        game_state.dropdown_menu.handle_event(event)
-        if game_state.popup:
-            game_state.popup.handle_event(event)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = event.pos
-            ic(mouse_pos)  # Debugging: Check mouse position on click
-            for rect, item_text in game_state.clickable_inventory_items:
-                if rect.collidepoint(mouse_pos):
-                    ic("Item clicked:", item_text)  # Debugging: Verify item click
-                    game_state.popup = Popup(item_text, game_state)
-                    ic("Popup created")  # Debugging: Verify popup creation
-                    break
-    return running
-    # ic(running)  # Debugging
+    game_state.hit_grid.sync(event_targets(buttons, game_state))
+    return game_state.event_dispatcher.dispatch(events)
 
-def draw_ui_elements(screen, game_state):
-    game_state.scrollable_text.draw(screen)
-    game_state.inventory_display.draw(screen)
-    game_state.dropdown_menu.draw(screen)
-    game_state.money_display.draw(screen)
-    game_state.time_display.draw(screen)
-    game_state.popularity_display.draw(screen)
+def handle_clock_key(key, engine):
+    # Space pauses and resumes, +/- double or halve the speed, F fast-forwards to closing time
+    if key == pygame.K_SPACE:
+        engine.clock.toggle_pause()
+    elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+        engine.set_mode(ACCELERATED, min(engine.speed * 2, MAX_CLOCK_SPEED))
+    elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+        engine.set_mode(ACCELERATED, max(engine.speed / 2, 1))
+    elif key == pygame.K_f:
+        engine.fast_forward()
+
+def update_game_state(game_state, elapsed):
+    # Advance the simulation by a frame's worth of time and push what changed into the displays
+    profiler = game_state.profiler
+    start = profiler.now()
+    ran = game_state.day_started and game_state.engine.update(elapsed)
+    profiler.add(SIMULATION, start)
+    if ran:
+        snapshot = game_state.engine.snapshot()
+        game_state.time_display.update_text(format_minute(snapshot.minute))
+        game_state.popularity_display.update_text(f"{snapshot.popularity} POP")
+        game_state.day_started = snapshot.store_open
+        game_state.journal.save()  # Autosave every simulated minute; only the changes are written
+        if not snapshot.store_open:
+            game_state.save_customers()  # The customer records are saved once a day, at closing time
+    game_state.autosave.poll()
+    cash_version = game_state.shop.version(CASH_CHANGED)
+    if cash_version != game_state.cash_version:
+        game_state.money_display.update_text(f"Money: ${game_state.shop.cash:.2f}")
+        game_state.cash_version = cash_version
+
+def ui_widgets(game_state):
+    # Bottom to top: the dropdown overlaps the review log when expanded, the popup overlaps everything
+    widgets = [
+        game_state.scrollable_text,
+        game_state.inventory_display,
+        game_state.dropdown_menu,
+        game_state.money_display,
+        game_state.time_display,
+        game_state.popularity_display,
+    ]
     if game_state.popup:
-        ic("Drawing popup")  # Debugging: Confirm popup drawing
-        game_state.popup.draw(screen)
+        widgets.append(game_state.popup)
+    if game_state.show_profiler:
+        widgets.append(game_state.profiler_overlay)
+    return widgets
+
+def draw_ui_elements(screen, game_state):
+    for widget in ui_widgets(game_state):
+        widget.draw(screen)
     # ic(screen)  # Debugging
 
 def display_message(screen, message, font, screen_width, screen_height):
     running = True
     while running:
         screen.fill(WHITE)
-        text_surf = font.render(message, True, RED)
+        text_surf = render_text(font, message, RED)
         text_rect = text_surf.get_rect(center=(screen_width // 2, screen_height // 2))
         screen.blit(text_surf, text_rect)
         pygame.display.flip()
@@ -1,16 +1,45 @@
+from collections import OrderedDict
+
 import pygame
 
-def draw_rounded_rect(surface, rect, color, corner_radius, alpha):
-    rect_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    rect_surface.set_alpha(alpha)
-    
-    pygame.draw.circle(rect_surface, color, (corner_radius, corner_radius), corner_radius)
-    pygame.draw.circle(rect_surface, color, (rect.width - corner_radius - 1, corner_radius), corner_radius)
-    pygame.draw.circle(rect_surface, color, (corner_radius, rect.height - corner_radius - 1), corner_radius)
-    pygame.draw.circle(rect_surface, color, (rect.width - corner_radius - 1, rect.height - corner_radius - 1), corner_radius)
-    
-    pygame.draw.rect(rect_surface, color, (corner_radius, 0, rect.width - 2 * corner_radius, rect.height))
-    pygame.draw.rect(rect_surface, color, (0, corner_radius, rect.width, rect.height - 2 * corner_radius))
-    
-    surface.blit(rect_surface, rect.topleft)
+MAX_CACHED_SURFACES = 64
+_surface_cache = OrderedDict()
+
+def _cached_surface(key, build):
+    # Prebaked shapes are rebuilt only when their size, color, radius or alpha change
+    surface = _surface_cache.get(key)
+    if surface is None:
+        surface = _surface_cache[key] = build()
+        if len(_surface_cache) > MAX_CACHED_SURFACES:
+            _surface_cache.popitem(last=False)
+    else:
+        _surface_cache.move_to_end(key)
+    return surface
+
+def rounded_rect_surface(size, color, corner_radius, alpha):
+    def build():
+        width, height = size
+        rect_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        rect_surface.set_alpha(alpha)
+
+        pygame.draw.circle(rect_surface, color, (corner_radius, corner_radius), corner_radius)
+        pygame.draw.circle(rect_surface, color, (width - corner_radius - 1, corner_radius), corner_radius)
+        pygame.draw.circle(rect_surface, color, (corner_radius, height - corner_radius - 1), corner_radius)
+        pygame.draw.circle(rect_surface, color, (width - corner_radius - 1, height - corner_radius - 1), corner_radius)
 
+        pygame.draw.rect(rect_surface, color, (corner_radius, 0, width - 2 * corner_radius, height))
+        pygame.draw.rect(rect_surface, color, (0, corner_radius, width, height - 2 * corner_radius))
+        return rect_surface
+
+    return _cached_surface(('rounded_rect', tuple(size), tuple(color), corner_radius, alpha), build)
+
+def overlay_surface(size, color):
+    def build():
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(color)
+        return overlay
+
+    return _cached_surface(('overlay', tuple(size), tuple(color)), build)
+
+def draw_rounded_rect(surface, rect, color, corner_radius, alpha):
+    surface.blit(rounded_rect_surface(rect.size, color, corner_radius, alpha), rect.topleft)